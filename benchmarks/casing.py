@@ -0,0 +1,53 @@
+"""
+Compare the humps walk of a payload with the memoized KeyConverter and the
+key table of its model.
+
+    python benchmarks/casing.py
+"""
+import timeit
+from typing import List, Optional
+
+from humps import camelize
+from pydantic import BaseModel
+
+from schema_validator.casing import casing_tables
+from schema_validator.json_provider import camelize_keys
+
+
+class Line(BaseModel):
+    stock_keeping_unit: str
+    line_quantity: int
+    unit_price: float
+
+
+class Order(BaseModel):
+    order_id: int
+    customer_name: str
+    is_paid: bool
+    internal_note: Optional[str]
+    order_lines: List[Line]
+
+
+ORDER = Order(
+    order_id=1, customer_name="bob", is_paid=True, internal_note=None,
+    order_lines=[
+        Line(stock_keeping_unit=f"sku-{i}", line_quantity=i, unit_price=9.5)
+        for i in range(10)
+    ],
+).dict()
+
+
+def main(number: int = 20000) -> None:
+    cases = {
+        "humps camelize": lambda: camelize(ORDER),
+        "memoized keys": lambda: camelize_keys(ORDER),
+        "key table": lambda: casing_tables.camelize(Order, ORDER),
+    }
+    for name, function in cases.items():
+        seconds = timeit.timeit(function, number=number)
+        print(f"{name:<24}{seconds / number * 1e6:8.2f} us per payload")
+    print(f"key cache: {camelize_keys.cache.info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""
+Compare the encoding of a response model through .dict() and the app json
+encoder with the serializer generated by CompiledPydanticEngine.
+
+    python benchmarks/serializers.py
+"""
+import json
+import timeit
+from datetime import datetime
+from enum import Enum
+from typing import List, Optional
+
+from pydantic import BaseModel
+
+from schema_validator.compat import model_dict, pydantic_encoder
+from schema_validator.engines import CompiledPydanticEngine
+
+
+class Status(str, Enum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class Line(BaseModel):
+    sku: str
+    quantity: int
+    price: float
+
+
+class Order(BaseModel):
+    id: int
+    customer: str
+    paid: bool
+    status: Status
+    note: Optional[str]
+    created: datetime
+    lines: List[Line]
+
+
+ORDER = Order(
+    id=1, customer="bob", paid=True, status="closed", note=None,
+    created=datetime(2021, 1, 1),
+    lines=[Line(sku=f"sku-{i}", quantity=i, price=9.5) for i in range(10)],
+)
+
+
+def main(number: int = 20000) -> None:
+    engine = CompiledPydanticEngine()
+    engine.prepare(Order)
+    cases = {
+        "dict + json encoder": lambda: json.dumps(
+            model_dict(ORDER), default=pydantic_encoder).encode("utf-8"),
+        "generated serializer": lambda: engine.serialize(Order, ORDER),
+    }
+    for name, function in cases.items():
+        seconds = timeit.timeit(function, number=number)
+        print(f"{name:<24}{seconds / number * 1e6:8.2f} us per response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+"""
+Compare the validation of flat request models by pydantic and by the
+validators generated by CompiledPydanticEngine.
+
+    python benchmarks/validators.py
+"""
+import timeit
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from pydantic import BaseModel
+
+from schema_validator.engines import CompiledPydanticEngine, PydanticEngine
+
+
+class Status(str, Enum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class Order(BaseModel):
+    id: int
+    customer: str
+    amount: float
+    paid: bool = False
+    status: Status = Status.OPEN
+    note: Optional[str] = None
+    created: Optional[datetime] = None
+
+
+DATA = {
+    "id": 1, "customer": "bob", "amount": 9.5, "paid": True,
+    "status": "closed", "note": None, "created": "2021-01-01T00:00:00",
+}
+
+
+def main(number: int = 100000) -> None:
+    for engine in (PydanticEngine(), CompiledPydanticEngine()):
+        model = engine.prepare(Order)
+        assert engine.validate_mapping(model, DATA) == Order(**DATA)
+        seconds = timeit.timeit(
+            lambda: engine.validate_mapping(model, DATA), number=number)
+        print(
+            f"{type(engine).__name__:<24}"
+            f"{seconds / number * 1e6:8.2f} us per validation"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,6 @@
 from .core import SchemaValidator
+from .engines import CompiledPydanticEngine, PydanticEngine, \
+    ValidationEngine, register_engine
+from .cache import InputMemo, ResponseCache
 from .utils import tags, DataSource
 from .command import generate_schema_command
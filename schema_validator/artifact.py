@@ -0,0 +1,192 @@
+import hashlib
+import json
+import logging
+import mmap
+import os
+import sys
+from typing import Any, Dict, List, Optional
+
+import pydantic
+from typing_extensions import get_args
+
+from schema_validator.cache import CachedDocument
+from schema_validator.compat import field_types
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_VERSION = 2
+
+
+class Artifact:
+    """
+        the documents of an openapi artifact, memory-mapped from the file
+
+        the file is a json header line followed by the encoded documents:
+            {"version": 2, "fingerprint": "...", "documents": [
+                [key, offset, length, gzip_offset, gzip_length, etag], ...
+            ]}
+
+        the documents are memoryviews of the read-only map, so processes
+        forked after loading share its pages instead of copying them.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file_:
+            self._buffer = mmap.mmap(
+                file_.fileno(), 0, access=mmap.ACCESS_READ)
+        end = self._buffer.find(b"\n")
+        header = json.loads(self._buffer[:end])
+        if not isinstance(header, dict) or \
+                header.get("version") != ARTIFACT_VERSION:
+            raise ValueError(f"unsupported artifact version: {path}")
+        self.fingerprint: str = header["fingerprint"]
+        self._index: List[list] = header["documents"]
+        self._offset = end + 1
+        size = max(
+            (max(offset + length, gzip_offset + gzip_length)
+             for _, offset, length, gzip_offset, gzip_length, _
+             in self._index),
+            default=0,
+        )
+        if self._offset + size > len(self._buffer):
+            raise ValueError(f"truncated artifact: {path}")
+
+    def documents(self) -> Dict[Any, CachedDocument]:
+        buffer = memoryview(self._buffer)
+        documents = {}
+        for key, offset, length, gzip_offset, gzip_length, etag \
+                in self._index:
+            start = self._offset + offset
+            gzip_start = self._offset + gzip_offset
+            documents[_load_key(key)] = CachedDocument(
+                buffer[start:start + length],
+                gzip_body=buffer[gzip_start:gzip_start + gzip_length],
+                etag=etag,
+            )
+        return documents
+
+
+def load_artifact(path: Optional[str]) -> Optional[Artifact]:
+    """
+    The artifact at path, None when there is none or it cannot be used
+    (another version, empty or corrupt) and the documents are rebuilt.
+    """
+    if not path or not os.path.exists(path):
+        return None
+    try:
+        return Artifact(path)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        logger.warning(f"ignore openapi artifact {path}: {e}")
+        return None
+
+
+def write_artifact(
+    path: str,
+    fingerprint: str,
+    documents: Dict[Any, CachedDocument]
+) -> None:
+    index = []
+    offset = 0
+    for key, document in documents.items():
+        gzip_offset = offset + len(document.body)
+        index.append([
+            _dump_key(key), offset, len(document.body),
+            gzip_offset, len(document.gzip_body), document.etag,
+        ])
+        offset = gzip_offset + len(document.gzip_body)
+
+    header = json.dumps({
+        "version": ARTIFACT_VERSION,
+        "fingerprint": fingerprint,
+        "documents": index,
+    }, ensure_ascii=False).encode("utf-8")
+
+    temp_path = f"{path}.tmp"
+    with open(temp_path, "wb") as file_:
+        file_.write(header + b"\n")
+        for document in documents.values():
+            file_.write(document.body)
+            file_.write(document.gzip_body)
+    os.replace(temp_path, path)
+
+
+def fingerprint(extension) -> str:
+    """
+    A digest of everything the documents are built from: the validator
+    settings, the registered endpoints and the source of the modules which
+    define their handlers, their models and the models nested in them.
+    """
+    digest = hashlib.sha256()
+    modules = set()
+    # the nested types are walked, not their schemas built, which is what
+    # a matching artifact saves
+    nested: Dict[Any, None] = {}
+
+    def update(value: Any) -> None:
+        digest.update(json.dumps(value, default=str).encode("utf-8"))
+
+    update([
+        ARTIFACT_VERSION, pydantic.VERSION, extension.title,
+        extension.version, extension.convert_casing,
+        extension.split_components, extension.servers,
+    ])
+    for entry in extension.endpoints:
+        models = [
+            entry.query_string,
+            entry.request[0] if entry.request else None,
+            *entry.responses.values(),
+        ]
+        update([
+            entry.endpoint, entry.method,
+            [rule.rule for rule in entry.rules],
+            entry.tags, sorted(map(str, entry.responses)),
+            [_qualified_name(model) for model in models],
+            entry.function.__doc__,
+        ])
+        modules.add(entry.function.__module__)
+        for model in models:
+            _walk_types(model, nested)
+
+    update(sorted(_qualified_name(type_) for type_ in nested))
+    modules.update(type_.__module__ for type_ in nested)
+
+    for module in sorted(modules):
+        update([module, _source_digest(module)])
+    return digest.hexdigest()
+
+
+def _walk_types(type_: Any, seen: Dict[Any, None]) -> None:
+    """Collect the classes a type refers to through fields and generics."""
+    if isinstance(type_, type):
+        if type_ in seen or type_.__module__ == "builtins":
+            return
+        seen[type_] = None
+        for field_type in field_types(type_):
+            _walk_types(field_type, seen)
+        return
+    for argument in get_args(type_):
+        _walk_types(argument, seen)
+
+
+def _qualified_name(model: Any) -> Optional[str]:
+    if model is None:
+        return None
+    if not isinstance(model, type):
+        return repr(model)
+    return f"{model.__module__}.{model.__qualname__}"
+
+
+def _source_digest(module: str) -> Optional[str]:
+    path = getattr(sys.modules.get(module), "__file__", None)
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, "rb") as file_:
+        return hashlib.sha256(file_.read()).hexdigest()
+
+
+def _dump_key(key: Any) -> Any:
+    return list(key) if isinstance(key, tuple) else key
+
+
+def _load_key(key: Any) -> Any:
+    return tuple(key) if isinstance(key, list) else key
@@ -0,0 +1,40 @@
+import os
+from typing import Dict, Optional, Tuple
+
+from schema_validator.cache import CachedDocument
+
+ASSETS_DIR = os.path.join(os.path.dirname(__file__), "static", "swagger-ui")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+SWAGGER_ASSETS = {
+    "SCHEMA_SWAGGER_JS_URL": ("swagger-ui-bundle.js", "text/javascript"),
+    "SCHEMA_SWAGGER_CSS_URL": ("swagger-ui.css", "text/css"),
+}
+
+
+class SwaggerAssets:
+    """
+        the vendored swagger ui files, served under content hashed names
+
+        assets.urls["SCHEMA_SWAGGER_JS_URL"]
+            -> "/swagger/static/swagger-ui-bundle.1a2b3c4d5e6f.js"
+    """
+
+    def __init__(self, prefix: str, directory: str = ASSETS_DIR) -> None:
+        self.urls: Dict[str, str] = {}
+        self._files: Dict[str, Tuple[CachedDocument, str]] = {}
+        for config_key, (filename, mimetype) in SWAGGER_ASSETS.items():
+            path = os.path.join(directory, filename)
+            with open(path, "rb") as file_:
+                body = file_.read()
+            gzip_body = None
+            if os.path.exists(f"{path}.gz"):
+                with open(f"{path}.gz", "rb") as file_:
+                    gzip_body = file_.read()
+            document = CachedDocument(body, gzip_body=gzip_body)
+            stem, extension = os.path.splitext(filename)
+            hashed = f"{stem}.{document.etag[:12]}{extension}"
+            self._files[hashed] = (document, mimetype)
+            self.urls[config_key] = f"{prefix}/{hashed}"
+
+    def get(self, filename: str) -> Optional[Tuple[CachedDocument, str]]:
+        return self._files.get(filename)
@@ -0,0 +1,340 @@
+import gzip
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple, Union
+
+from schema_validator.compat import pydantic_encoder
+
+
+class CachedDocument:
+    """
+        an encoded document kept ready to be served
+
+        body: the identity encoded bytes
+        gzip_body: the gzip encoded variant of body
+        etag / gzip_etag: strong etags of each variant
+
+        the bodies are memoryviews when they are shared from a memory map
+    """
+
+    __slots__ = ("body", "gzip_body", "etag", "gzip_etag")
+
+    def __init__(
+        self,
+        body: Union[bytes, memoryview],
+        gzip_body: Union[bytes, memoryview, None] = None,
+        etag: Optional[str] = None
+    ) -> None:
+        if gzip_body is None:
+            gzip_body = gzip.compress(body, mtime=0)
+        self.body = body
+        self.gzip_body = gzip_body
+        self.etag = etag or hashlib.sha1(body).hexdigest()
+        self.gzip_etag = f"{self.etag}-gzip"
+
+    def negotiate(
+        self,
+        accept_encodings: Any
+    ) -> Tuple[Union[bytes, memoryview], str, Optional[str]]:
+        """
+        The body, etag and Content-Encoding of the variant for the
+        Accept-Encoding of a request, gzip unless its quality is 0.
+        """
+        if accept_encodings["gzip"] > 0:
+            return self.gzip_body, self.gzip_etag, "gzip"
+        return self.body, self.etag, None
+
+
+class CacheInfo(NamedTuple):
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+    @property
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class LRUCache:
+    """
+        a bounded, thread-safe mapping which evicts the least recently
+        used entries, with the hit and miss counts of get()
+
+        cache = LRUCache(1024, ttl=60)
+        cache.set(key, value)
+        cache.get(key)
+        cache.info().hit_ratio
+
+        ttl: the seconds an entry is kept, the expired entries are misses
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        ttl: Optional[float] = None,
+        timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._timer = timer
+        self._data: "OrderedDict[Any, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            if self.ttl is not None:
+                value, expires = value
+                if expires <= self._timer():
+                    del self._data[key]
+                    self.misses += 1
+                    return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: Any, value: Any) -> None:
+        if self.ttl is not None:
+            value = (value, self._timer() + self.ttl)
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self))
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+
+class InputMemo:
+    """
+        the validated inputs of endpoints keyed by a digest of their raw
+        query string or body, so a repeated input is neither parsed nor
+        validated again
+
+        memo = InputMemo(maxsize=1024, ttl=60)
+
+        @validate(query_string=Query, memo=memo)
+
+        the same instance is handed to every request with the input, so
+        only frozen models are memoized. the inputs which fail validation
+        are not kept.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 60.0):
+        self.cache = LRUCache(maxsize, ttl)
+
+    @staticmethod
+    def key(type_: Any, raw: bytes) -> Any:
+        return type_, hashlib.blake2b(raw, digest_size=16).digest()
+
+    def get(self, key: Any) -> Any:
+        return self.cache.get(key)
+
+    def set(self, key: Any, value: Any) -> None:
+        self.cache.set(key, value)
+
+    @property
+    def hits(self) -> int:
+        return self.cache.hits
+
+    @property
+    def misses(self) -> int:
+        return self.cache.misses
+
+    def info(self) -> CacheInfo:
+        return self.cache.info()
+
+    def clear(self) -> None:
+        self.cache.clear()
+
+
+class CachedResponse:
+    """
+        a response kept by a ResponseCache
+
+        status: the status code
+        headers: the headers of the response but Content-Length
+        document: the body, its gzip variant and their etags
+    """
+
+    __slots__ = ("status", "headers", "document")
+
+    def __init__(
+        self,
+        status: int,
+        headers: List[Tuple[str, str]],
+        document: CachedDocument
+    ) -> None:
+        self.status = status
+        self.headers = headers
+        self.document = document
+
+    def to_bytes(self) -> bytes:
+        document = self.document
+        head = json.dumps({
+            "status": self.status,
+            "headers": self.headers,
+            "etag": document.etag,
+            "size": len(document.body),
+        })
+        return b"".join((
+            head.encode("utf-8"), b"\n", document.body, document.gzip_body))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> "CachedResponse":
+        head, _, bodies = data.partition(b"\n")
+        meta = json.loads(head)
+        size = meta["size"]
+        return cls(
+            meta["status"],
+            [(name, value) for name, value in meta["headers"]],
+            CachedDocument(bodies[:size], bodies[size:], meta["etag"])
+        )
+
+
+class MemoryResponseBackend:
+    """
+        the responses of a ResponseCache kept in the process, the least
+        recently used ones are evicted past maxsize
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        timer: Callable[[], float] = time.monotonic
+    ) -> None:
+        self.cache = LRUCache(maxsize)
+        self._timer = timer
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        entry = self.cache.get(key)
+        if entry is None:
+            return None
+        response, expires = entry
+        if expires is not None and expires <= self._timer():
+            return None
+        return response
+
+    def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        ttl: Optional[float]
+    ) -> None:
+        expires = None if ttl is None else self._timer() + ttl
+        self.cache.set(key, (response, expires))
+
+
+class RedisResponseBackend:
+    """
+        the responses of a ResponseCache kept in redis, shared by every
+        process of the app
+
+        client: a redis.Redis, or any client with its get() and set(px=)
+        prefix: the prefix of the keys
+
+        the size of the cache is bounded by the maxmemory-policy of redis.
+    """
+
+    def __init__(self, client: Any, prefix: str = "schema-validator:"):
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        data = self.client.get(self.prefix + key)
+        return None if data is None else CachedResponse.from_bytes(data)
+
+    def set(
+        self,
+        key: str,
+        response: CachedResponse,
+        ttl: Optional[float]
+    ) -> None:
+        px = None if ttl is None else max(int(ttl * 1000), 1)
+        self.client.set(self.prefix + key, response.to_bytes(), px=px)
+
+
+class ResponseCache:
+    """
+        the encoded responses of GET endpoints keyed by the endpoint, its
+        path arguments and its validated query string
+
+        cache = ResponseCache(ttl=30, maxsize=1024)
+        cache = ResponseCache(backend=RedisResponseBackend(redis.Redis()))
+
+        @validate(query_string=Query, responses=Items, cache=cache)
+
+        a hit skips the handler and the validation of its response, the
+        query strings which validate to the same model share a response.
+        only the 200 responses without cookies, a Vary on other headers
+        than Accept-Encoding or a Cache-Control of private, no-store or
+        no-cache are kept, along with their gzip variant, and
+        the requests with an Authorization or a Cookie header bypass the
+        cache. without a query string model the raw query string is part
+        of the key.
+    """
+
+    def __init__(
+        self,
+        ttl: Optional[float] = 60.0,
+        maxsize: int = 1024,
+        backend: Any = None
+    ) -> None:
+        self.ttl = ttl
+        self.backend = backend if backend is not None else \
+            MemoryResponseBackend(maxsize)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(endpoint: str, view_args: Any, query: Any) -> str:
+        data = json.dumps(
+            [view_args, query], sort_keys=True, separators=(",", ":"),
+            default=pydantic_encoder
+        )
+        digest = hashlib.blake2b(data.encode("utf-8"), digest_size=16)
+        return f"{endpoint}:{digest.hexdigest()}"
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        response = self.backend.get(key)
+        with self._lock:
+            if response is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return response
+
+    def set(
+        self,
+        key: str,
+        status: int,
+        headers: List[Tuple[str, str]],
+        body: bytes
+    ) -> CachedResponse:
+        response = CachedResponse(status, headers, CachedDocument(body))
+        self.backend.set(key, response, self.ttl)
+        return response
@@ -0,0 +1,196 @@
+import json
+import threading
+from dataclasses import asdict, is_dataclass
+from typing import Any, Dict, Optional, Tuple
+
+from humps import camelize
+
+from schema_validator.engines import ValidationEngine
+from schema_validator.json_provider import KeyConverter, camelize_keys, \
+    decamelize_keys, json_default
+from schema_validator.registry import model_registry
+from schema_validator.types import PydanticModel
+
+
+class KeyTable:
+    """
+        the converted keys of an object, or the table of the items of an
+        array, as the schema of a model describes them
+
+        keys: key -> (converted key, table of the value or None)
+        items: the table of each item
+
+        the values without a table (free-form dicts, Any) and the keys which
+        are not declared are left to the KeyConverter.
+    """
+
+    __slots__ = ("keys", "items")
+
+    def __init__(self) -> None:
+        self.keys: Optional[Dict[str, Tuple[str, Optional[KeyTable]]]] = None
+        self.items: Optional[KeyTable] = None
+
+    def convert(self, value: Any, converter: KeyConverter) -> Any:
+        if self.keys is not None and type(value) is not dict and \
+                is_dataclass(value) and not isinstance(value, type):
+            # the dataclasses nested in the .dict() of a model
+            value = asdict(value)
+        if self.keys is not None and type(value) is dict:
+            keys = self.keys
+            result = {}
+            for key, item in value.items():
+                entry = keys.get(key)
+                if entry is None:
+                    result[converter.key(key)] = converter(item)
+                elif entry[1] is None:
+                    result[entry[0]] = converter(item)
+                else:
+                    result[entry[0]] = entry[1].convert(item, converter)
+            return result
+        if self.items is not None and type(value) is list:
+            items = self.items
+            return [items.convert(item, converter) for item in value]
+        return converter(value)
+
+
+class CasingTables:
+    """
+        the camelCase key tables of the validated types, built once from
+        their schemas
+
+        casing_tables.camelize(TodoResponse, todo_dict)
+        casing_tables.decamelize(Todo, request_dict)
+    """
+
+    def __init__(self) -> None:
+        self._tables: Dict[Tuple, Optional[KeyTable]] = {}
+        self._lock = threading.Lock()
+
+    def camelize(
+        self,
+        type_: PydanticModel,
+        value: Any,
+        engine: Optional[ValidationEngine] = None
+    ) -> Any:
+        table = self.table(type_, camel=True, engine=engine)
+        if table is None:
+            return camelize_keys(value)
+        return table.convert(value, camelize_keys)
+
+    def decamelize(
+        self,
+        type_: PydanticModel,
+        value: Any,
+        engine: Optional[ValidationEngine] = None
+    ) -> Any:
+        table = self.table(type_, camel=False, engine=engine)
+        if table is None:
+            return decamelize_keys(value)
+        return table.convert(value, decamelize_keys)
+
+    def table(
+        self,
+        type_: PydanticModel,
+        camel: bool,
+        engine: Optional[ValidationEngine] = None
+    ) -> Optional[KeyTable]:
+        """
+        camel: the table from the field names to camelCase, else the one
+        from camelCase back to the field names.
+        engine: the engine of the endpoint, which gives the schema
+        """
+        key = (type_, camel, engine)
+        try:
+            return self._tables[key]
+        except KeyError:
+            pass
+        with self._lock:
+            if key not in self._tables:
+                schema = model_registry.schema(
+                    model_registry.model(type_, engine), engine=engine)
+                self._tables[key] = _build_table(
+                    schema, schema.get("definitions", {}), camel, {})
+        return self._tables[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._tables.clear()
+
+
+def _build_table(
+    schema: dict,
+    definitions: Dict[str, dict],
+    camel: bool,
+    built: Dict[str, Optional[KeyTable]]
+) -> Optional[KeyTable]:
+    members = [
+        member for member in schema.get("anyOf", schema.get("allOf", []))
+        if member.get("type") != "null"
+    ]
+    if len(members) == 1:
+        # an optional value or a ref with a description
+        return _build_table(members[0], definitions, camel, built)
+    ref = schema.get("$ref")
+    if ref is not None:
+        name = ref.rsplit("/", 1)[-1]
+        if name not in built:
+            # registered first so recursive models refer to themselves
+            table = built[name] = KeyTable()
+            _fill_table(
+                table, definitions.get(name, {}), definitions, camel, built)
+            if table.keys is None and table.items is None:
+                built[name] = None
+        return built[name]
+    table = KeyTable()
+    _fill_table(table, schema, definitions, camel, built)
+    if table.keys is None and table.items is None:
+        return None
+    return table
+
+
+def _fill_table(
+    table: KeyTable,
+    schema: dict,
+    definitions: Dict[str, dict],
+    camel: bool,
+    built: Dict[str, Optional[KeyTable]]
+) -> None:
+    properties = schema.get("properties")
+    if properties is not None:
+        keys = table.keys = {}
+        for name, property_ in properties.items():
+            value = _build_table(property_, definitions, camel, built)
+            if camel:
+                keys[name] = (camelize(name), value)
+            else:
+                keys[camelize(name)] = (name, value)
+    elif schema.get("type") == "array" and isinstance(
+        schema.get("items"), dict
+    ):
+        table.items = _build_table(
+            schema["items"], definitions, camel, built)
+
+
+casing_tables = CasingTables()
+
+_encoder = json.JSONEncoder(
+    default=json_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def camelized_json(
+    type_: PydanticModel,
+    value: Any,
+    engine: Optional[ValidationEngine] = None
+) -> bytes:
+    """The json of the builtins of a validated type with camelCase keys."""
+    value = casing_tables.camelize(type_, value, engine)
+    return _encoder.encode(value).encode("utf-8")
+
+
+def decamelized_json(
+    type_: PydanticModel,
+    data: bytes,
+    engine: Optional[ValidationEngine] = None
+) -> Any:
+    """The request body of a validated type with the keys it declares."""
+    return casing_tables.decamelize(type_, json.loads(data), engine)
@@ -1,9 +1,10 @@
-import json
+import os
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import click
 
-from schema_validator.types import Optional
-from schema_validator.core import _build_openapi_schema
+from schema_validator.core import _iter_openapi_json
+from schema_validator.registry import model_registry
 
 try:
     from flask import current_app as app
@@ -18,32 +19,103 @@ except ImportError:
     "--output",
     "-o",
     type=click.Path(),
-    help="Output the spec to a file given by a path.",
+    help="Output the spec to a file given by a path, a directory when "
+         "more than one tag is exported.",
 )
 @click.option(
     "--tag",
     "-t",
     type=str,
-    required=False,
-    default="",
-    help="Export swagger include tag"
+    multiple=True,
+    help="Export swagger include tag, can be repeated"
+)
+@click.option(
+    "--all-tags",
+    is_flag=True,
+    default=False,
+    help="Export the swagger of every tag into the output directory"
+)
+@click.option(
+    "--workers",
+    "-w",
+    type=int,
+    default=1,
+    help="Generate the model schemas in this many processes."
+)
+@click.option(
+    "--artifact",
+    "-a",
+    type=click.Path(),
+    help="Write the prebuilt documents to an artifact loaded at startup.",
 )
 @with_appcontext
 def generate_schema_command(
     output: Optional[str],
-    tag: Optional[str]
+    tag: Tuple[str, ...],
+    all_tags: bool,
+    workers: int,
+    artifact: Optional[str]
 ) -> None:
     """
     The command which can dump json-swagger
         app.cli.add_command(generate_schema_command)
     virtualenv: flask schema
+
+    Several tags are exported in one pass into a directory:
+        flask schema -o specs -t ACCOUNT -t ORDER
+        flask schema -o specs --all-tags -w 8
+
+    With --artifact the documents of every tag are written to the path,
+    set SCHEMA_OPENAPI_ARTIFACT to it so that they are not built again.
     """
-    schema = _build_openapi_schema(
-        app, app.extensions["SCHEMA_VALIDATOR"], tag if tag else None)
+    extension = app.extensions["SCHEMA_VALIDATOR"]
+    if workers > 1:
+        for engine, models in _models_by_engine(extension).items():
+            model_registry.prefetch(
+                models, extension.convert_casing, workers, engine)
+
+    if artifact is not None:
+        extension.write_artifact(app, artifact)
+        if output is None:
+            return
+
+    tags = list(extension.endpoints.tags) if all_tags else list(tag)
+    if len(tags) > 1 or all_tags:
+        if output is None:
+            raise click.UsageError("--output directory is required")
+        os.makedirs(output, exist_ok=True)
+        for name in tags:
+            _write_spec(
+                _iter_openapi_json(app, extension, name, indent=2),
+                os.path.join(output, f"openapi-{name}.json")
+            )
+        return
+
+    chunks = _iter_openapi_json(
+        app, extension, tags[0] if tags else None, indent=2)
+    _write_spec(chunks, output)
+
+
+def _models_by_engine(extension) -> Dict[Any, List[Any]]:
+    """The models of the endpoints keyed by the engine of each endpoint."""
+    models: Dict[Any, Dict[Any, None]] = {}
+    for entry in extension.endpoints:
+        engine_models = models.setdefault(
+            entry.engine or extension.engine, {})
+        if entry.request is not None:
+            engine_models[entry.request[0]] = None
+        if entry.query_string is not None:
+            engine_models[entry.query_string] = None
+        engine_models.update(dict.fromkeys(entry.responses.values()))
+    return {engine: list(types) for engine, types in models.items()}
+
 
-    formatted_spec = json.dumps(schema, indent=2, ensure_ascii=False)
+def _write_spec(chunks: Iterable[str], output: Optional[str]) -> None:
     if output is not None:
         with open(output, "w") as file_:
-            click.echo(formatted_spec, file=file_)
+            file_.writelines(chunks)
+            file_.write("\n")
     else:
-        click.echo(formatted_spec)
+        for chunk in chunks:
+            click.echo(chunk, nl=False)
+        click.echo()
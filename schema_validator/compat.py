@@ -0,0 +1,189 @@
+import functools
+import re
+from dataclasses import MISSING, fields, is_dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+import pydantic
+from pydantic import BaseModel
+
+PYDANTIC_V2 = int(pydantic.VERSION.split(".")[0]) >= 2
+
+if PYDANTIC_V2:
+    from pydantic import ConfigDict, TypeAdapter, create_model
+    from pydantic_core import PydanticSerializationError, \
+        to_jsonable_python
+
+    # to_jsonable_python dispatches on the type in compiled code
+    ENCODERS_BY_TYPE: Dict[type, Callable[[Any], Any]] = {}
+
+    def pydantic_encoder(object_: Any) -> Any:
+        try:
+            return to_jsonable_python(object_)
+        except PydanticSerializationError as e:
+            # a json default() tells unknown types with a TypeError
+            raise TypeError(str(e)) from e
+
+    def is_builtin_dataclass(object_: Any) -> bool:
+        return is_dataclass(object_) and \
+            not hasattr(object_, "__pydantic_validator__")
+
+    def dataclass_model(dataclass: type) -> type:
+        definitions = {}
+        for field in fields(dataclass):
+            if field.default is not MISSING:
+                default = field.default
+            elif field.default_factory is not MISSING:
+                default = pydantic.Field(default_factory=field.default_factory)
+            else:
+                default = ...
+            definitions[field.name] = (field.type, default)
+        return create_model(
+            dataclass.__name__,
+            __config__=ConfigDict(
+                frozen=dataclass.__dataclass_params__.frozen),
+            __module__=dataclass.__module__,
+            __doc__=dataclass.__doc__,
+            **definitions
+        )
+
+    @functools.lru_cache(maxsize=None)
+    def _dataclass_adapter(dataclass: type) -> Any:
+        # pydantic dataclasses have no model_* methods of their own
+        return TypeAdapter(dataclass)
+
+    def model_schema(model: type, ref_prefix: str) -> dict:
+        if not issubclass(model, BaseModel):
+            return adapter_schema(_dataclass_adapter(model), ref_prefix)
+        schema = model.model_json_schema(ref_template=f"{ref_prefix}{{model}}")
+        if "$defs" in schema:
+            schema["definitions"] = schema.pop("$defs")
+        return schema
+
+    def model_dict(model: BaseModel) -> dict:
+        return model.model_dump()
+
+    def parse_json(model: type, data: bytes) -> Any:
+        if not issubclass(model, BaseModel):
+            return _dataclass_adapter(model).validate_json(data)
+        return model.model_validate_json(data)
+
+    def dump_json(model: BaseModel) -> Optional[bytes]:
+        return model.__pydantic_serializer__.to_json(model)
+
+    def type_adapter(type_: Any) -> Any:
+        return TypeAdapter(type_)
+
+    def adapter_validate(adapter: Any, data: Any) -> Any:
+        return adapter.validate_python(data)
+
+    def adapter_validate_json(adapter: Any, data: bytes) -> Any:
+        return adapter.validate_json(data)
+
+    def adapter_schema(adapter: Any, ref_prefix: str) -> dict:
+        schema = adapter.json_schema(ref_template=f"{ref_prefix}{{model}}")
+        if "$defs" in schema:
+            schema["definitions"] = schema.pop("$defs")
+        return schema
+
+    def adapter_dump_json(adapter: Any, value: Any) -> Optional[bytes]:
+        return adapter.dump_json(value)
+
+    def adapter_builtins(adapter: Any, value: Any) -> Any:
+        return adapter.dump_python(value)
+
+else:
+    from pydantic import create_model
+    from pydantic.dataclasses import dataclass as pydantic_dataclass, \
+        is_builtin_dataclass
+    from pydantic.json import ENCODERS_BY_TYPE, pydantic_encoder
+    from pydantic.schema import model_schema
+
+    def dataclass_model(dataclass: type) -> type:
+        return pydantic_dataclass(
+            dataclass, frozen=dataclass.__dataclass_params__.frozen
+        ).__pydantic_model__
+
+    def model_dict(model: BaseModel) -> dict:
+        return model.dict()
+
+    def dump_json(model: BaseModel) -> Optional[bytes]:
+        # the v1 .json() still builds a dict, leave it to the app encoder
+        return None
+
+    def type_adapter(type_: Any) -> Any:
+        return create_model("TypeAdapter", __root__=(type_, ...))
+
+    def adapter_validate(adapter: Any, data: Any) -> Any:
+        return adapter(__root__=data).__root__
+
+    def adapter_schema(adapter: Any, ref_prefix: str) -> dict:
+        schema = model_schema(adapter, ref_prefix=ref_prefix)
+        schema.pop("title", None)
+        return schema
+
+    def adapter_dump_json(adapter: Any, value: Any) -> Optional[bytes]:
+        return None
+
+    def adapter_builtins(adapter: Any, value: Any) -> Any:
+        return adapter.construct(__root__=value).dict()["__root__"]
+
+
+def is_frozen(type_: Any) -> bool:
+    """Whether the instances of a model, dataclass or msgspec Struct can
+    not be assigned to."""
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        if PYDANTIC_V2:
+            return bool(type_.model_config.get("frozen"))
+        config = type_.__config__
+        return bool(getattr(config, "frozen", False)) or \
+            not config.allow_mutation
+    params = getattr(type_, "__dataclass_params__", None)
+    if params is not None:
+        return params.frozen
+    config = getattr(type_, "__struct_config__", None)
+    return config is not None and config.frozen
+
+
+def field_types(type_: Any) -> List[Any]:
+    """The declared types of the fields of a model or a dataclass."""
+    if isinstance(type_, type) and issubclass(type_, BaseModel):
+        if PYDANTIC_V2:
+            return [
+                field.annotation for field in type_.model_fields.values()]
+        return [field.outer_type_ for field in type_.__fields__.values()]
+    if isinstance(type_, type) and is_dataclass(type_):
+        return [field.type for field in fields(type_)]
+    return []
+
+
+def normalize_name(name: str) -> str:
+    return re.sub(r"[^a-zA-Z0-9.\-_]", "_", name)
+
+
+def get_long_model_name(model: type) -> str:
+    return f"{model.__module__}__{model.__qualname__}".replace(".", "__")
+
+
+__all__ = [
+    "ENCODERS_BY_TYPE",
+    "PYDANTIC_V2",
+    "adapter_builtins",
+    "adapter_dump_json",
+    "adapter_schema",
+    "adapter_validate",
+    "dataclass_model",
+    "dump_json",
+    "field_types",
+    "get_long_model_name",
+    "is_builtin_dataclass",
+    "is_frozen",
+    "model_dict",
+    "model_schema",
+    "normalize_name",
+    "pydantic_encoder",
+    "type_adapter",
+]
+
+if PYDANTIC_V2:
+    # raw json is only validated by pydantic-core
+    __all__ += ["adapter_validate_json", "parse_json"]
@@ -0,0 +1,335 @@
+import json
+from datetime import date, datetime
+from enum import Enum, IntEnum
+from json.encoder import encode_basestring
+from typing import Any, Callable, Dict, List, Optional, Set
+
+from pydantic import BaseModel
+
+from schema_validator.compat import PYDANTIC_V2, pydantic_encoder
+
+if not PYDANTIC_V2:
+    from pydantic import Extra
+    from pydantic.datetime_parse import parse_date, parse_datetime
+    from pydantic.fields import SHAPE_LIST, SHAPE_SINGLETON
+
+_MISSING = object()
+_CONSTANTS = (type(None), bool, int, float, str)
+
+
+def compile_validator(model: Any) -> Optional[Callable[[Any], Any]]:
+    """
+        a function validating a mapping into an instance of the flat model
+
+        every field is checked and coerced by straight-line code, any input
+        it does not take as is (a missing required field, a value which
+        needs coercing or fails) is handed to the model itself, so the
+        results and errors are the ones of pydantic.
+
+        None when the model is not flat or uses validators, aliases or
+        config the generated code does not reproduce, and with pydantic v2
+        which already validates in compiled code.
+    """
+    if PYDANTIC_V2 or not _is_flat(model):
+        return None
+
+    namespace: Dict[str, Any] = {
+        "model": model,
+        "MISSING": _MISSING,
+        "new": object.__new__,
+        "setattr_": object.__setattr__,
+        "parse_date": parse_date,
+        "parse_datetime": parse_datetime,
+    }
+    lines = [
+        "def validate(data):",
+        "    if not isinstance(data, dict):",
+        "        return model(**data)",
+        "    get = data.get",
+        "    fields_set = set()",
+    ]
+    values = []
+    for index, (name, field) in enumerate(model.__fields__.items()):
+        value = f"f{index}"
+        values.append(f"{name!r}: {value}")
+        lines.append(f"    v = get({field.alias!r}, MISSING)")
+        lines.append("    if v is MISSING:")
+        if field.required:
+            lines.append("        return model(**data)")
+        elif isinstance(field.default, _CONSTANTS + (Enum,)) and \
+                field.default_factory is None:
+            namespace[f"D{index}"] = field.default
+            lines.append(f"        {value} = D{index}")
+        else:
+            namespace[f"default{index}"] = field.get_default
+            lines.append(f"        {value} = default{index}()")
+        lines.append("    else:")
+        lines.append(f"        fields_set.add({name!r})")
+        check = _check(field.type_, value, index, namespace)
+        if field.allow_none:
+            lines.append("        if v is None:")
+            lines.append(f"            {value} = None")
+            lines.append("        else:")
+            lines.extend(f"    {line}" for line in check)
+        else:
+            lines.extend(check)
+
+    lines.append("    m = new(model)")
+    lines.append(f"    setattr_(m, '__dict__', {{{', '.join(values)}}})")
+    lines.append("    setattr_(m, '__fields_set__', fields_set)")
+    if model.__private_attributes__:
+        lines.append("    m._init_private_attributes()")
+    lines.append("    return m")
+
+    code = compile(
+        "\n".join(lines), f"<validator {model.__qualname__}>", "exec")
+    exec(code, namespace)
+    return namespace["validate"]
+
+
+def _check(
+    type_: Any,
+    value: str,
+    index: int,
+    namespace: Dict[str, Any]
+) -> List[str]:
+    fallback = "            return model(**data)"
+    if type_ is Any:
+        return [f"        {value} = v"]
+    if type_ is bool:
+        return [
+            "        if v is not True and v is not False:",
+            fallback,
+            f"        {value} = v",
+        ]
+    if type_ is int or type_ is str:
+        return [
+            f"        if type(v) is not {type_.__name__}:",
+            fallback,
+            f"        {value} = v",
+        ]
+    if type_ is float:
+        return [
+            "        if type(v) is float:",
+            f"            {value} = v",
+            "        elif type(v) is int:",
+            f"            {value} = float(v)",
+            "        else:",
+            fallback,
+        ]
+    if type_ is datetime or type_ is date:
+        call = f"parse_{type_.__name__}(v)"
+    else:
+        namespace[f"E{index}"] = type_
+        call = f"E{index}(v)"
+    return [
+        "        try:",
+        f"            {value} = {call}",
+        "        except (TypeError, ValueError):",
+        fallback,
+    ]
+
+
+def _is_flat(model: Any) -> bool:
+    if not (isinstance(model, type) and issubclass(model, BaseModel)):
+        return False
+    config = model.__config__
+    if (
+        model.__init__ is not BaseModel.__init__
+        or model.__custom_root_type__
+        or model.__pre_root_validators__
+        or model.__post_root_validators__
+        or config.extra is not Extra.ignore
+        or config.validate_all
+        or config.use_enum_values
+        or config.anystr_strip_whitespace
+        or getattr(config, "anystr_lower", False)
+        or getattr(config, "anystr_upper", False)
+        or config.min_anystr_length
+        or config.max_anystr_length is not None
+        or getattr(config, "allow_inf_nan", True) is False
+    ):
+        return False
+    return all(_is_flat_field(field) for field in model.__fields__.values())
+
+
+def _is_flat_field(field: Any) -> bool:
+    type_ = field.type_
+    return (
+        field.shape == SHAPE_SINGLETON
+        and field.sub_fields is None
+        and field.alias == field.name
+        and not field.class_validators
+        and not field.pre_validators
+        and not field.post_validators
+        and not field.validate_always
+        and (
+            type_ in (Any, bool, int, float, str, datetime, date)
+            or isinstance(type_, type) and issubclass(type_, Enum)
+            and not issubclass(type_, IntEnum)
+        )
+    )
+
+
+def compile_serializer(model: Any) -> Optional[Callable[[Any], str]]:
+    """
+        a function writing an instance of the model as compact json
+
+        the keys are written from precomputed fragments and every field by
+        the encoder of its declared type, without building the .dict()
+        tree or going through the json encoder default() of each value.
+        the output is the json of the dict pydantic_encoder makes of it.
+
+        None for the models with fields it has no encoder for (anything
+        but int, float, str, bool, date, datetime, enums, Any, lists and
+        nested models of those), excluded fields, json_encoders or extra
+        fields, and with pydantic v2 which serializes in compiled code.
+    """
+    if PYDANTIC_V2:
+        return None
+    return _compile_serializer(model, set())
+
+
+def _compile_serializer(
+    model: Any,
+    seen: Set[type]
+) -> Optional[Callable[[Any], str]]:
+    if not (isinstance(model, type) and issubclass(model, BaseModel)):
+        return None
+    config = model.__config__
+    if (
+        model in seen
+        or model.__custom_root_type__
+        or config.extra is Extra.allow
+        or config.json_encoders
+    ):
+        return None
+
+    namespace: Dict[str, Any] = {"model": model, "generic": _encode_generic}
+    lines = [
+        "def serialize(m):",
+        "    if type(m) is not model:",
+        "        return generic(m)",
+        "    d = m.__dict__",
+    ]
+    parts = []
+    for index, (name, field) in enumerate(model.__fields__.items()):
+        if field.field_info.exclude is not None or \
+                field.field_info.include is not None:
+            return None
+        encoder = _field_encoder(field, seen | {model})
+        if encoder is None:
+            return None
+        namespace[f"e{index}"] = encoder
+        key = encode_basestring(name)
+        namespace[f"K{index}"] = f"{',' if index else '{'}{key}:"
+        lines.append(f"    p{index} = e{index}(d[{name!r}])")
+        parts.extend((f"K{index}", f"p{index}"))
+    if not parts:
+        parts.append("'{'")
+    parts.append("'}'")
+    lines.append(f"    return ''.join(({', '.join(parts)},))")
+
+    code = compile(
+        "\n".join(lines), f"<serializer {model.__qualname__}>", "exec")
+    exec(code, namespace)
+    return namespace["serialize"]
+
+
+def _field_encoder(field: Any, seen: Set[type]) -> Optional[Callable]:
+    if field.shape == SHAPE_LIST and field.sub_fields:
+        encoder = _field_encoder(field.sub_fields[0], seen)
+        if encoder is not None:
+            encoder = _list_encoder(encoder)
+    elif field.shape == SHAPE_SINGLETON and field.sub_fields is None:
+        encoder = _type_encoder(field.type_, seen)
+    else:
+        encoder = None
+    if encoder is not None and field.allow_none:
+        encoder = _optional_encoder(encoder)
+    return encoder
+
+
+def _type_encoder(type_: Any, seen: Set[type]) -> Optional[Callable]:
+    if type_ is Any:
+        return _encode_generic
+    if type_ is bool:
+        return _encode_bool
+    if type_ is int:
+        return _encode_int
+    if type_ is float:
+        return _encode_float
+    if type_ is str:
+        return _encode_str
+    if type_ is datetime or type_ is date:
+        return _encode_isoformat
+    if isinstance(type_, type) and issubclass(type_, Enum):
+        return _encode_enum
+    return _compile_serializer(type_, seen)
+
+
+def _optional_encoder(encoder: Callable) -> Callable:
+    def encode(value: Any) -> str:
+        return "null" if value is None else encoder(value)
+    return encode
+
+
+def _list_encoder(encoder: Callable) -> Callable:
+    def encode(value: Any) -> str:
+        if type(value) is not list:
+            return _encode_generic(value)
+        return f"[{','.join(map(encoder, value))}]"
+    return encode
+
+
+# the encoders of the declared types write the values of other types
+# (assigned without validation or given to construct) like .json() would
+
+
+def _encode_bool(value: bool) -> str:
+    if value is True:
+        return "true"
+    if value is False:
+        return "false"
+    return _encode_generic(value)
+
+
+def _encode_int(value: int) -> str:
+    if type(value) is not int:
+        return _encode_generic(value)
+    return int.__repr__(value)
+
+
+def _encode_str(value: str) -> str:
+    if type(value) is not str:
+        return _encode_generic(value)
+    return encode_basestring(value)
+
+
+def _encode_float(value: float) -> str:
+    if type(value) is not float:
+        return _encode_generic(value)
+    if value != value:
+        return "NaN"
+    if value in (float("inf"), float("-inf")):
+        return "Infinity" if value > 0 else "-Infinity"
+    return float.__repr__(value)
+
+
+def _encode_isoformat(value: date) -> str:
+    if type(value) is not datetime and type(value) is not date:
+        return _encode_generic(value)
+    return f'"{value.isoformat()}"'
+
+
+def _encode_enum(value: Enum) -> str:
+    if not isinstance(value, Enum):
+        return _encode_generic(value)
+    return _encode_generic(value.value)
+
+
+def _encode_generic(value: Any) -> str:
+    return json.dumps(
+        value, default=pydantic_encoder, ensure_ascii=False,
+        separators=(",", ":")
+    )
@@ -2,8 +2,14 @@ SCHEMA_REQUEST_ATTRIBUTE = "_schema_request_schema"
 SCHEMA_RESPONSE_ATTRIBUTE = "_schema_response_schemas"
 SCHEMA_QUERYSTRING_ATTRIBUTE = "_schema_querystring_schema"
 SCHEMA_TAG_ATTRIBUTE = "_schema_tag_schemas"
+SCHEMA_ENGINE_ATTRIBUTE = "_schema_engine"
 REF_PREFIX = "#/components/schemas/"
+JSON_CONTENT_TYPE = "application/json"
 IGNORE_METHODS = {"OPTIONS", "HEAD"}
+IGNORE_ENDPOINTS = {
+    "static", "openapi", "swagger_ui", "swagger_ui_tag", "openapi_tag",
+    "openapi_component", "swagger_static"
+}
 
 SWAGGER_TEMPLATE = """
 <head>
@@ -1,28 +1,41 @@
 import re
+import hashlib
+import json
+import asyncio
 import logging
-from collections.abc import Mapping
-from typing import Any, Dict, List, Optional, Tuple
+import threading
+from functools import wraps
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+    Tuple
+)
 
-from humps import camelize, decamelize
-from pydantic.json import pydantic_encoder
-from pydantic.schema import model_schema
+from jinja2 import Environment
 
+from schema_validator.assets import SwaggerAssets
+from schema_validator.artifact import fingerprint, load_artifact, \
+    write_artifact
+from schema_validator.cache import CachedDocument
+from schema_validator.compat import get_long_model_name, normalize_name, \
+    pydantic_encoder
 from schema_validator.constants import (
-    IGNORE_METHODS, REF_PREFIX, SCHEMA_QUERYSTRING_ATTRIBUTE,
-    SCHEMA_REQUEST_ATTRIBUTE, SCHEMA_RESPONSE_ATTRIBUTE, SCHEMA_TAG_ATTRIBUTE,
-    SWAGGER_CSS_URL, SWAGGER_JS_URL
+    REF_PREFIX, SWAGGER_CSS_URL, SWAGGER_JS_URL, SWAGGER_TEMPLATE
 )
-from schema_validator.types import ServerObject
+from schema_validator.engines import ValidationEngine
+from schema_validator.json_provider import CasingJSONDecoder, \
+    CasingJSONEncoder, PydanticJSONEncoder, camelize_keys, decamelize_keys, \
+    json_provider
+from schema_validator.registry import Endpoint, EndpointRegistry, \
+    model_registry
+from schema_validator.types import PydanticModel, ServerObject
 from schema_validator.utils import DataSource
 
 
 try:
     from quart import current_app, render_template_string
-    from quart.json import JSONDecoder, JSONEncoder
     IS_FLASK = False
 except ImportError:
-    from flask import current_app, render_template_string, Flask
-    from flask.json import JSONDecoder, JSONEncoder
+    from flask import current_app, render_template_string
     IS_FLASK = True
 
 
@@ -30,27 +43,6 @@ PATH_RE = re.compile("<(?:[^:]*:)?([^>]+)>")
 logger = logging.getLogger(__name__)
 
 
-class PydanticJSONEncoder(JSONEncoder):
-    def default(self, object_: Any) -> Any:
-        return pydantic_encoder(object_)
-
-
-class CasingJSONEncoder(PydanticJSONEncoder):
-    def encode(self, object_: Any) -> Any:
-        if isinstance(object_, (list, Mapping)):
-            object_ = camelize(object_)
-        return super().encode(camelize(object_))
-
-
-class CasingJSONDecoder(JSONDecoder):
-    def __init__(self, *args: Any, **kwargs: Any) -> None:
-        super().__init__(*args, object_hook=self.object_hook, **kwargs)
-
-    @staticmethod
-    def object_hook(object_: dict) -> Any:
-        return decamelize(object_)
-
-
 class SchemaValidator:
     """A Flask-Schema instance.
 
@@ -68,6 +60,12 @@ class SchemaValidator:
             swagger or None to disable swagger documentation.
         title: The publishable title for the app.
         version: The publishable version for the app.
+        split_components: Serve every component schema from its own url
+            and reference it from the documents instead of embedding it.
+        artifact_path: The artifact written by `schema --artifact`, its
+            documents are served while its fingerprint matches the app.
+        engine: The ValidationEngine of the endpoints which do not choose
+            one, pydantic by default.
     """
 
     def __init__(
@@ -78,26 +76,47 @@ class SchemaValidator:
         title: Optional[str] = None,
         version: str = "0.1.0",
         convert_casing: bool = False,
-        servers: Optional[List[ServerObject]] = None
+        servers: Optional[List[ServerObject]] = None,
+        split_components: bool = False,
+        artifact_path: Optional[str] = None,
+        engine: Optional[ValidationEngine] = None
     ) -> None:
         self.openapi_path = "/swagger/openapi.json"
         self.openapi_tag_path = "/swagger/openapi-<tag>.json"
+        self.openapi_component_path = "/swagger/schemas/<name>.json"
+        self.swagger_static_path = "/swagger/static"
         self.swagger_ui_path = swagger_ui_path
         self.title = title
         self.version = version
         self.convert_casing = convert_casing
         self.servers = servers or []
+        self.split_components = split_components
+        self.artifact_path = artifact_path
+        self.engine = engine
+        self._artifact = None
+        self._documents: Dict[Any, CachedDocument] = {}
+        self._pages: Dict[Tuple, CachedDocument] = {}
+        self._pending: Dict[Any, asyncio.Future] = {}
+        self._warm_up_task: Optional[asyncio.Future] = None
+        self._swagger_template = None
+        self.swagger_assets: Optional[SwaggerAssets] = None
+        self._documents_state: Optional[int] = None
+        self.endpoints = EndpointRegistry()
+        self._fragments: Dict[Tuple, Any] = {}
+        self._component_names: Dict[Any, str] = {}
+        self._component_owners: Dict[str, Any] = {}
+        self._lock = threading.Lock()
         if app is not None:
             self.init_app(app)
 
     def init_app(self, app) -> None:
         app.extensions["SCHEMA_VALIDATOR"] = self
         self.title = app.name if self.title is None else self.title
-        if self.convert_casing:
-            app.json_decoder = CasingJSONDecoder
-            app.json_encoder = CasingJSONEncoder
-        else:
-            app.json_encoder = PydanticJSONEncoder
+        for rule in app.url_map.iter_rules():
+            view_func = app.view_functions.get(rule.endpoint)
+            if view_func is not None:
+                self.endpoints.add(rule, view_func)
+        app.add_url_rule = self._register_endpoints(app, app.add_url_rule)
 
         app.config.setdefault(
             "SCHEMA_SWAGGER_JS_URL",
@@ -107,22 +126,60 @@ class SchemaValidator:
             "SCHEMA_SWAGGER_CSS_URL",
             SWAGGER_CSS_URL
         )
+        app.config.setdefault(
+            "SCHEMA_SWAGGER_LOCAL_ASSETS",
+            False
+        )
+        app.config.setdefault(
+            "SCHEMA_OPENAPI_CACHE_CONTROL",
+            "no-cache"
+        )
+        app.config.setdefault(
+            "SCHEMA_OPENAPI_STREAM",
+            False
+        )
+        app.config.setdefault(
+            "SCHEMA_OPENAPI_ARTIFACT",
+            self.artifact_path
+        )
+        app.config.setdefault(
+            "SCHEMA_JSON_BACKEND",
+            "json"
+        )
+        app.config.setdefault(
+            "SCHEMA_CASING_CACHE_SIZE",
+            4096
+        )
+        camelize_keys.cache.maxsize = decamelize_keys.cache.maxsize = \
+            app.config["SCHEMA_CASING_CACHE_SIZE"]
+        if getattr(app, "json_provider_class", None) is not None:
+            app.json = json_provider(
+                app, app.config["SCHEMA_JSON_BACKEND"], self.convert_casing)
+        elif self.convert_casing:
+            app.json_decoder = CasingJSONDecoder
+            app.json_encoder = CasingJSONEncoder
+        else:
+            app.json_encoder = PydanticJSONEncoder
+        self._artifact = load_artifact(app.config["SCHEMA_OPENAPI_ARTIFACT"])
+        self._swagger_template = Environment(autoescape=True).from_string(
+            SWAGGER_TEMPLATE)
 
         try:
-            if isinstance(app, Flask):
-                IS_FLASK = True
-            else:
-                IS_FLASK = False
-        except BaseException:
+            from flask import Flask
+            IS_FLASK = isinstance(app, Flask)
+        except ImportError:
             IS_FLASK = False
 
         if self.openapi_path is not None and app.config.get("SWAGGER_ROUTE"):
             if IS_FLASK:
-                from .flask import openapi, swagger_ui
+                from .flask import openapi, openapi_component, swagger_ui, \
+                    swagger_static
                 app_name = "FLASK"
             else:
-                from .quart import openapi, swagger_ui, convert_model_result
+                from .quart import openapi, openapi_component, swagger_ui, \
+                    swagger_static, convert_model_result
                 app.make_response = convert_model_result(app.make_response)
+                app.before_serving(self._warm_up(app))
                 app_name = "QUART"
 
             logger.info(f"start validator by {app_name}")
@@ -135,6 +192,11 @@ class SchemaValidator:
                 self.openapi_tag_path, "openapi_tag",
                 lambda tag: openapi(self, tag)
             )
+            if self.split_components:
+                app.add_url_rule(
+                    self.openapi_component_path, "openapi_component",
+                    lambda name: openapi_component(self, name)
+                )
 
             if self.swagger_ui_path is not None:
                 app.add_url_rule(
@@ -145,6 +207,203 @@ class SchemaValidator:
                     f"{self.swagger_ui_path}/<tag>", "swagger_ui_tag",
                     lambda tag: swagger_ui(self, tag)
                 )
+                if app.config["SCHEMA_SWAGGER_LOCAL_ASSETS"]:
+                    self.swagger_assets = SwaggerAssets(
+                        self.swagger_static_path)
+                    app.add_url_rule(
+                        f"{self.swagger_static_path}/<filename>",
+                        "swagger_static",
+                        lambda filename: swagger_static(self, filename)
+                    )
+
+    def _register_endpoints(self, app, add_url_rule: Callable) -> Callable:
+        @wraps(add_url_rule)
+        def decorator(*args: Any, **kwargs: Any) -> Any:
+            count = len(app.url_map._rules)
+            result = add_url_rule(*args, **kwargs)
+            for rule in app.url_map._rules[count:]:
+                view_func = app.view_functions.get(rule.endpoint)
+                if view_func is not None:
+                    self.endpoints.add(rule, view_func)
+            return result
+
+        return decorator
+
+    def openapi_document(
+        self,
+        app,
+        tag: Optional[str] = None
+    ) -> Optional[CachedDocument]:
+        """
+        The encoded openapi document, built once per tag and rebuilt only
+        after routes have been added to the app, None for a tag which no
+        endpoint has.
+        """
+        if tag is not None and not self.endpoints.has_tag(tag):
+            return None
+        return self._cached_document(
+            app, tag, lambda: _build_openapi_schema(app, self, tag))
+
+    async def openapi_document_async(
+        self,
+        app,
+        tag: Optional[str] = None
+    ) -> Optional[CachedDocument]:
+        """
+        openapi_document for event loops, the document is built in the
+        default executor and concurrent callers wait for the same build.
+        """
+        return await self._run_in_executor(
+            tag, self.openapi_document, app, tag)
+
+    async def component_document_async(
+        self,
+        app,
+        name: str
+    ) -> Optional[CachedDocument]:
+        return await self._run_in_executor(
+            ("schemas", name), self.component_document, app, name)
+
+    async def _run_in_executor(self, key: Any, build: Callable, *args) -> Any:
+        document = self._documents.get(key)
+        if document is not None and \
+                self._documents_state == self.endpoints.version:
+            return document
+        future = self._pending.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(None, build, *args)
+            self._pending[key] = future
+            future.add_done_callback(lambda _: self._pending.pop(key, None))
+        return await asyncio.shield(future)
+
+    def _warm_up(self, app) -> Callable:
+        async def warm_up() -> None:
+            # not awaited, serving starts while the document is built
+            self._warm_up_task = asyncio.ensure_future(
+                self.openapi_document_async(app))
+
+        return warm_up
+
+    def swagger_ui_document(
+        self,
+        app,
+        tag: Optional[str] = None
+    ) -> Optional[CachedDocument]:
+        """
+        The rendered swagger ui page, rendered once per tag, None for a tag
+        which no endpoint has.
+        """
+        if tag is not None and not self.endpoints.has_tag(tag):
+            return None
+        urls = app.config
+        if self.swagger_assets is not None:
+            urls = self.swagger_assets.urls
+        js_url = urls["SCHEMA_SWAGGER_JS_URL"]
+        css_url = urls["SCHEMA_SWAGGER_CSS_URL"]
+        key = (tag, js_url, css_url)
+        page = self._pages.get(key)
+        if page is None:
+            path = f"/swagger/openapi-{tag}.json" if tag \
+                else self.openapi_path
+            html = self._swagger_template.render(
+                title=self.title,
+                openapi_path=path,
+                swagger_js_url=js_url,
+                swagger_css_url=css_url,
+            )
+            page = self._pages[key] = CachedDocument(html.encode("utf-8"))
+        return page
+
+    def stream_openapi_document(
+        self,
+        app,
+        tag: Optional[str] = None
+    ) -> Iterator[bytes]:
+        """The openapi document encoded chunk by chunk, see _iter_json."""
+        for chunk in _iter_openapi_json(app, self, tag):
+            yield chunk.encode("utf-8")
+
+    def component_document(
+        self,
+        app,
+        name: str
+    ) -> Optional[CachedDocument]:
+        """
+        The encoded schema of one component for split_components, None if
+        no endpoint uses a component of that name.
+        """
+        def build() -> dict:
+            schema = _build_components(app, self)[name]
+            return _rewrite_refs(schema, "{name}.json")
+
+        try:
+            return self._cached_document(app, ("schemas", name), build)
+        except KeyError:
+            return None
+
+    def openapi_documents(self, app) -> Dict[Any, CachedDocument]:
+        """Every document served by the app, keyed like the cache."""
+        documents = {None: self.openapi_document(app)}
+        for tag in self.endpoints.tags:
+            documents[tag] = self.openapi_document(app, tag)
+        if self.split_components:
+            for name in _build_components(app, self):
+                documents[("schemas", name)] = \
+                    self.component_document(app, name)
+        return documents
+
+    def write_artifact(self, app, path: str) -> None:
+        write_artifact(path, fingerprint(self), self.openapi_documents(app))
+
+    def share_documents(self, app, path: Optional[str] = None) -> None:
+        """
+        Serve every document from a read-only memory map of the artifact
+        at path (SCHEMA_OPENAPI_ARTIFACT by default), the artifact is
+        written first unless it matches the app already. Call it in the
+        master process after the routes are registered, e.g. with
+        gunicorn --preload, so that the workers share the mapped pages.
+        """
+        path = path or app.config["SCHEMA_OPENAPI_ARTIFACT"]
+        if path is None:
+            raise ValueError("share_documents needs an artifact path")
+        artifact = load_artifact(path)
+        if artifact is None or artifact.fingerprint != fingerprint(self):
+            self.write_artifact(app, path)
+            artifact = load_artifact(path)
+        with self._lock:
+            self._artifact = artifact
+            self._documents_state = None
+        self.openapi_documents(app)
+
+    def _cached_document(
+        self,
+        app,
+        key: Any,
+        build: Callable
+    ) -> CachedDocument:
+        state = self.endpoints.version
+        with self._lock:
+            if state != self._documents_state:
+                self._documents.clear()
+                self._documents_state = state
+                if self._artifact is not None and \
+                        self._artifact.fingerprint == fingerprint(self):
+                    self._documents.update(self._artifact.documents())
+            document = self._documents.get(key)
+            if document is None:
+                document = CachedDocument(_encode_document(build()))
+                self._documents[key] = document
+        return document
+
+
+def _encode_document(schema: dict) -> bytes:
+    return json.dumps(
+        schema,
+        default=pydantic_encoder,
+        ensure_ascii=False,
+        separators=(",", ":"),
+    ).encode("utf-8")
 
 
 def _split_definitions(schema: dict) -> Tuple[dict, dict]:
@@ -153,120 +412,303 @@ def _split_definitions(schema: dict) -> Tuple[dict, dict]:
     return definitions, new_schema
 
 
-def _build_openapi_schema(
-    app,
-    extension: SchemaValidator,
-    expected_tag: str = None
-) -> dict:
-    """
-    params:
-        expected_tag: str
-    """
-    paths: Dict[str, dict] = {}
-    components = {"schemas": {}}
+class _Fragment(NamedTuple):
+    path: str
+    method: str
+    tags: List[str]
+    path_object: dict
+    definitions: dict
 
-    for rule in app.url_map.iter_rules():
-        if rule.endpoint in [
-            "static", "openapi", "swagger_ui",
-            "swagger_ui_tag", "openapi_tag"
-        ]:
-            continue
 
-        func = app.view_functions[rule.endpoint]
+def _fragment_key(entry: Endpoint, rule) -> Tuple:
+    return (
+        rule.rule,
+        entry.engine,
+        entry.endpoint,
+        entry.method,
+        entry.function,
+        entry.tags,
+        tuple(entry.responses.items()),
+        entry.request,
+        entry.query_string,
+    )
 
-        for method in rule.methods - IGNORE_METHODS:
-            view_func = None
-            view_class = getattr(func, "view_class", None)
 
-            if view_class is not None:
-                view_func = getattr(view_class, method.lower(), None)
+def _schema_key(schema: dict) -> str:
+    return json.dumps(schema, sort_keys=True, default=str)
 
-            path_object = {
-                "parameters": [], "responses": {},
+
+def _component_name(
+    model: PydanticModel,
+    schema: dict,
+    extension: SchemaValidator
+) -> str:
+    """
+    The name of the model under components/schemas, the long (module
+    qualified) name is used when the name is taken by another schema.
+    """
+    name = extension._component_names.get(model)
+    if name is None:
+        name = normalize_name(model.__name__)
+        key = _schema_key(schema)
+        owners = extension._component_owners
+        if owners.setdefault(name, key) != key:
+            name = get_long_model_name(model)
+            owners.setdefault(name, key)
+        extension._component_names[model] = name
+    return name
+
+
+def _add_definitions(
+    schema: dict,
+    components: Dict[str, dict],
+    extension: SchemaValidator
+) -> dict:
+    """
+    Register the nested definitions of the schema under components and
+    return the schema without them. A definition named like another
+    schema of the app is renamed with a digest of its own schema, and
+    the refs to it are rewritten.
+    """
+    definitions, schema = _split_definitions(schema)
+    owners = extension._component_owners
+    names: Dict[str, str] = {}
+    for name, definition in definitions.items():
+        key = _schema_key(definition)
+        if owners.setdefault(name, key) != key:
+            digest = hashlib.sha1(key.encode("utf-8")).hexdigest()[:8]
+            names[name] = f"{name}__{digest}"
+            owners.setdefault(names[name], key)
+    if names:
+        definitions = {
+            names.get(name, name): _rename_refs(definition, names)
+            for name, definition in definitions.items()
+        }
+        schema = _rename_refs(schema, names)
+    components.update(definitions)
+    return schema
+
+
+def _rename_refs(value: Any, names: Dict[str, str]) -> Any:
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        value = {key: _rename_refs(item, names)
+                 for key, item in value.items()}
+        if isinstance(ref, str) and ref.startswith(REF_PREFIX):
+            name = ref[len(REF_PREFIX):]
+            value["$ref"] = f"{REF_PREFIX}{names.get(name, name)}"
+        return value
+    if isinstance(value, list):
+        return [_rename_refs(item, names) for item in value]
+    return value
+
+
+def _model_ref(
+    model: PydanticModel,
+    components: Dict[str, dict],
+    extension: SchemaValidator,
+    engine: Optional[ValidationEngine] = None
+) -> dict:
+    """Register the model under components and return a ref to it."""
+    schema = model_registry.schema(model, extension.convert_casing, engine)
+    schema = _add_definitions(schema, components, extension)
+    if "$ref" in schema or not isinstance(model, type):
+        # recursive models are already a ref into their definitions and
+        # List[...] / Dict[...] bodies have no name of their own
+        return schema
+    name = _component_name(model, schema, extension)
+    components[name] = schema
+    return {"$ref": f"{REF_PREFIX}{name}"}
+
+
+def _build_fragment(
+    entry: Endpoint,
+    rule,
+    extension: SchemaValidator
+) -> _Fragment:
+    path_object = {
+        "parameters": [], "responses": {},
+    }
+    components: Dict[str, dict] = {}
+    function = entry.function
+    engine = entry.engine or extension.engine
+
+    if function.__doc__ is not None:
+        summary, *description = function.__doc__.splitlines()
+        path_object["description"] = "\n".join(description)
+        path_object["summary"] = summary
+
+    tags = list(entry.tags)
+    if tags:
+        path_object["tags"] = tags
+
+    for status_code, model_class in entry.responses.items():
+        schema = _model_ref(model_class, components, extension, engine)
+        path_object["responses"][status_code] = {  # type: ignore
+            "content": {
+                "application/json": {
+                    "schema": schema,
+                },
+            },
+            "description": model_class.__doc__,
+        }
+
+    request_data = entry.request
+
+    if request_data is not None:
+        schema = _model_ref(request_data[0], components, extension, engine)
+
+        if request_data[1] == DataSource.JSON:
+            encoding = "application/json"
+        else:
+            encoding = "application/x-www-form-urlencoded"
+
+        path_object["requestBody"] = {
+            "content": {
+                encoding: {
+                    "schema": schema,
+                },
+            },
+        }
+
+    querystring_model = entry.query_string
+    if querystring_model is not None:
+        schema = model_registry.schema(
+            querystring_model, extension.convert_casing, engine)
+        schema = _add_definitions(schema, components, extension)
+        for name, type_ in schema.get("properties", {}).items():
+            path_object["parameters"].append(
+                {
+                    "name": name,
+                    "in": "query",
+                    "schema": type_,
+                }
+            )
+    for name, converter in rule._converters.items():
+        path_object["parameters"].append(
+            {
+                "name": name,
+                "in": "path",
             }
-            function = view_func or func
+        )
+    path = re.sub(PATH_RE, r"{\1}", rule.rule)
+    return _Fragment(
+        path, entry.method.lower(), tags, path_object, components)
 
-            if function.__doc__ is not None:
-                summary, *description = function.__doc__.splitlines()
-                path_object["description"] = "\n".join(description)
-                path_object["summary"] = summary
 
-            if view_class:
-                tags = getattr(view_class, SCHEMA_TAG_ATTRIBUTE, [])
-            else:
-                tags = getattr(func, SCHEMA_TAG_ATTRIBUTE, [])
-
-            if tags:
-                path_object["tags"] = tags
-
-            if expected_tag and expected_tag not in tags:
-                continue
-
-            response_models = getattr(function, SCHEMA_RESPONSE_ATTRIBUTE, {})
-
-            for status_code, model_class in response_models.items():
-                schema = model_schema(model_class, ref_prefix=REF_PREFIX)
-                if extension.convert_casing:
-                    schema = camelize(schema)
-                definitions, schema = _split_definitions(schema)
-                components["schemas"].update(definitions)
-                path_object["responses"][status_code] = {  # type: ignore
-                    "content": {
-                        "application/json": {
-                            "schema": schema,
-                        },
-                    },
-                    "description": model_class.__doc__,
-                }
+def _iter_fragments(
+    app,
+    extension: SchemaValidator,
+    expected_tag: Optional[str] = None
+) -> List[_Fragment]:
+    """
+    Path objects are cached per (rule, method, view function, schema
+    attributes), so only new or changed endpoints are built again.
+    """
+    fragments = extension._fragments
+    seen: Dict[Tuple, _Fragment] = {}
+
+    if expected_tag:
+        entries = extension.endpoints.for_tag(expected_tag)
+    else:
+        entries = list(extension.endpoints)
+
+    for entry in entries:
+        for rule in entry.rules:
+            key = _fragment_key(entry, rule)
+            fragment = fragments.get(key)
+            if fragment is None:
+                fragment = _build_fragment(entry, rule, extension)
+            seen[key] = fragment
+
+    if expected_tag:
+        fragments.update(seen)
+    else:
+        extension._fragments = seen
+    return list(seen.values())
+
+
+def _build_components(app, extension: SchemaValidator) -> Dict[str, dict]:
+    schemas: Dict[str, dict] = {}
+    for fragment in _iter_fragments(app, extension):
+        schemas.update(fragment.definitions)
+    return schemas
+
+
+def _collect_refs(value: Any, names: List[str]) -> None:
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        if isinstance(ref, str) and ref.startswith(REF_PREFIX):
+            names.append(ref[len(REF_PREFIX):])
+        for item in value.values():
+            _collect_refs(item, names)
+    elif isinstance(value, list):
+        for item in value:
+            _collect_refs(item, names)
+
+
+def _used_components(paths: dict, schemas: Dict[str, dict]) -> dict:
+    """Only keep the components which are reachable from the paths."""
+    pending: List[str] = []
+    _collect_refs(paths, pending)
+    used: Dict[str, dict] = {}
+    while pending:
+        name = pending.pop()
+        if name in used or name not in schemas:
+            continue
+        used[name] = schemas[name]
+        _collect_refs(schemas[name], pending)
+    return {name: schemas[name] for name in schemas if name in used}
+
+
+def _rewrite_refs(value: Any, template: str) -> Any:
+    """Point the component refs at external documents."""
+    if isinstance(value, dict):
+        ref = value.get("$ref")
+        value = {key: _rewrite_refs(item, template)
+                 for key, item in value.items()}
+        if isinstance(ref, str) and ref.startswith(REF_PREFIX):
+            value["$ref"] = template.format(name=ref[len(REF_PREFIX):])
+        return value
+    if isinstance(value, list):
+        return [_rewrite_refs(item, template) for item in value]
+    return value
+
+
+def _document_parts(
+    app,
+    extension: SchemaValidator,
+    expected_tag: Optional[str] = None
+) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """The paths and the used components, sharing the cached fragments."""
+    paths: Dict[str, dict] = {}
+    schemas: Dict[str, dict] = {}
 
-            request_data = getattr(function, SCHEMA_REQUEST_ATTRIBUTE, None)
-
-            if request_data is not None:
-                schema = model_schema(request_data[0], ref_prefix=REF_PREFIX)
-                if extension.convert_casing:
-                    schema = camelize(schema)
-                definitions, schema = _split_definitions(schema)
-                components["schemas"].update(definitions)
-
-                if request_data[1] == DataSource.JSON:
-                    encoding = "application/json"
-                else:
-                    encoding = "application/x-www-form-urlencoded"
-
-                path_object["requestBody"] = {
-                    "content": {
-                        encoding: {
-                            "schema": schema,
-                        },
-                    },
-                }
+    for fragment in _iter_fragments(app, extension, expected_tag):
+        schemas.update(fragment.definitions)
+        paths.setdefault(fragment.path, {})
+        paths[fragment.path][fragment.method] = fragment.path_object
 
-            querystring_model = getattr(
-                function, SCHEMA_QUERYSTRING_ATTRIBUTE, None)
-            if querystring_model is not None:
-                schema = model_schema(querystring_model, ref_prefix=REF_PREFIX)
-                if extension.convert_casing:
-                    schema = camelize(schema)
-                definitions, schema = _split_definitions(schema)
-                components["schemas"].update(definitions)
-                for name, type_ in schema["properties"].items():
-                    path_object["parameters"].append(
-                        {
-                            "name": name,
-                            "in": "query",
-                            "schema": type_,
-                        }
-                    )
-            for name, converter in rule._converters.items():
-                path_object["parameters"].append(
-                    {
-                        "name": name,
-                        "in": "path",
-                    }
-                )
-            path = re.sub(PATH_RE, r"{\1}", rule.rule)
-            paths.setdefault(path, {})
-            paths[path][method.lower()] = path_object
+    if extension.split_components:
+        return paths, {}
+    return paths, _used_components(paths, schemas)
+
+
+def _build_openapi_schema(
+    app,
+    extension: SchemaValidator,
+    expected_tag: str = None
+) -> dict:
+    """
+    params:
+        expected_tag: str
+
+    The components are tree-shaken to the ones used by the paths. With
+    split_components the refs point at the component urls instead.
+    """
+    paths, schemas = _document_parts(app, extension, expected_tag)
+    if extension.split_components:
+        paths = _rewrite_refs(paths, "schemas/{name}.json")
 
     return {
         "openapi": "3.0.3",
@@ -274,8 +716,80 @@ def _build_openapi_schema(
             "title": extension.title,
             "version": extension.version,
         },
-        "components": components,
+        "components": {"schemas": schemas},
         "paths": paths,
         "tags": [],
         "servers": extension.servers,
     }
+
+
+class _JSONObject:
+    """The (key, value) pairs of an object which _iter_json encodes lazily."""
+
+    def __init__(self, items: Iterable[Tuple[str, Any]]) -> None:
+        self.items = items
+
+
+def _iter_json(
+    value: _JSONObject,
+    encoder: json.JSONEncoder,
+    level: int = 0
+) -> Iterator[str]:
+    indent = encoder.indent
+    if indent is None:
+        newline, separator = "", ":"
+    else:
+        newline, separator = "\n" + " " * indent * (level + 1), ": "
+
+    yield "{"
+    first = True
+    for key, item in value.items:
+        yield f"{'' if first else ','}{newline}{encoder.encode(key)}{separator}"
+        if isinstance(item, _JSONObject):
+            yield from _iter_json(item, encoder, level + 1)
+        elif indent is None:
+            yield encoder.encode(item)
+        else:
+            yield encoder.encode(item).replace("\n", newline)
+        first = False
+    if indent is not None and not first:
+        yield "\n" + " " * indent * level
+    yield "}"
+
+
+def _iter_openapi_json(
+    app,
+    extension: SchemaValidator,
+    expected_tag: Optional[str] = None,
+    indent: Optional[int] = None
+) -> Iterator[str]:
+    """
+    Encode the openapi document chunk by chunk, one chunk per path and
+    component, without building the whole document or string.
+    """
+    paths, schemas = _document_parts(app, extension, expected_tag)
+    if extension.split_components:
+        path_items: Iterable[Tuple[str, Any]] = (
+            (path, _rewrite_refs(item, "schemas/{name}.json"))
+            for path, item in paths.items()
+        )
+    else:
+        path_items = paths.items()
+
+    encoder = json.JSONEncoder(
+        default=pydantic_encoder,
+        ensure_ascii=False,
+        indent=indent,
+        separators=(",", ":") if indent is None else (",", ": "),
+    )
+    document = _JSONObject([
+        ("openapi", "3.0.3"),
+        ("info", {"title": extension.title, "version": extension.version}),
+        ("components", _JSONObject([
+            ("schemas", _JSONObject(schemas.items()))
+        ])),
+        ("paths", _JSONObject(path_items)),
+        ("tags", []),
+        ("servers", extension.servers),
+    ])
+    return _iter_json(document, encoder)
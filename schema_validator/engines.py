@@ -0,0 +1,306 @@
+import functools
+import json
+from abc import ABC, abstractmethod
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from typing_extensions import get_origin, is_typeddict
+
+from schema_validator.compat import PYDANTIC_V2, adapter_builtins, \
+    adapter_dump_json, adapter_schema, adapter_validate, dataclass_model, \
+    dump_json, is_builtin_dataclass, model_dict, model_schema, type_adapter
+from schema_validator.compiler import compile_serializer, compile_validator
+from schema_validator.types import PydanticModel
+
+if PYDANTIC_V2:
+    from schema_validator.compat import adapter_validate_json, parse_json
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class ValidationEngine(ABC):
+    """
+        the hooks `validate` uses to handle a body, query or response type
+
+        prepare: convert the declared type once, at decoration time
+        validate_bytes: parse and validate a raw json body
+        validate_mapping: validate an already decoded mapping
+        serialize: encode a validated value of the type to json bytes,
+            None leaves the value to the app json encoder through
+            to_builtins
+        json_schema: the schema of the type with refs to ref_prefix
+
+        errors are the exceptions which mean the input is invalid, they are
+        answered with a 400 validation_error.
+
+        supports, validate_mapping, to_builtins and json_schema are
+        abstract, an engine without them can not be created.
+
+        validate(body=Todo, engine=SomeEngine())
+        SchemaValidator(app, engine=SomeEngine())
+    """
+
+    errors: Tuple[Type[BaseException], ...] = (TypeError, ValueError)
+    raw_json = True
+
+    @abstractmethod
+    def supports(self, type_: Any) -> bool:
+        raise NotImplementedError()
+
+    def prepare(self, type_: Any) -> Any:
+        return type_
+
+    def validate_bytes(self, type_: Any, data: bytes) -> Any:
+        return self.validate_mapping(type_, json.loads(data))
+
+    @abstractmethod
+    def validate_mapping(self, type_: Any, data: Mapping) -> Any:
+        raise NotImplementedError()
+
+    def serialize(self, type_: Any, value: Any) -> Optional[bytes]:
+        return None
+
+    @abstractmethod
+    def to_builtins(self, type_: Any, value: Any) -> Any:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def json_schema(self, type_: Any, ref_prefix: str) -> dict:
+        raise NotImplementedError()
+
+
+class PydanticEngine(ValidationEngine):
+    """
+        pydantic models and dataclasses, the default engine
+
+        the raw body is only validated by pydantic-core with pydantic v2,
+        with v1 it is decoded by the request first.
+    """
+
+    errors = (TypeError, ValidationError)
+    raw_json = PYDANTIC_V2
+
+    def supports(self, type_: Any) -> bool:
+        return isinstance(type_, type) and (
+            issubclass(type_, BaseModel) or is_dataclass(type_)
+        )
+
+    def prepare(self, type_: Any) -> Any:
+        if is_builtin_dataclass(type_):
+            return dataclass_model(type_)
+        return type_
+
+    def validate_bytes(self, type_: Any, data: bytes) -> Any:
+        if PYDANTIC_V2:
+            return parse_json(type_, data)
+        return super().validate_bytes(type_, data)
+
+    def validate_mapping(self, type_: Any, data: Mapping) -> Any:
+        return type_(**data)
+
+    def serialize(self, type_: Any, value: Any) -> Optional[bytes]:
+        if isinstance(value, BaseModel):
+            return dump_json(value)
+        return None
+
+    def to_builtins(self, type_: Any, value: Any) -> Any:
+        if is_dataclass(value):
+            return asdict(value)
+        return model_dict(value)
+
+    def json_schema(self, type_: Any, ref_prefix: str) -> dict:
+        return model_schema(type_, ref_prefix=ref_prefix)
+
+
+class CompiledPydanticEngine(PydanticEngine):
+    """
+        pydantic models and dataclasses, validated and serialized by
+        functions generated for them when they are prepared
+
+        validate(body=Todo, engine=CompiledPydanticEngine())
+
+        see compiler.compile_validator and compiler.compile_serializer for
+        the models which are compiled, the others are left to pydantic.
+    """
+
+    def __init__(self) -> None:
+        self._validators: Dict[Any, Callable[[Any], Any]] = {}
+        self._serializers: Dict[Any, Optional[Callable[[Any], str]]] = {}
+
+    def __getstate__(self) -> dict:
+        # the generated functions are rebuilt by the process it is sent to
+        return {}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+
+    def prepare(self, type_: Any) -> Any:
+        model = super().prepare(type_)
+        self.validator(model)
+        self.serializer(model)
+        return model
+
+    def validator(self, type_: Any) -> Callable[[Any], Any]:
+        validator = self._validators.get(type_)
+        if validator is None:
+            validator = compile_validator(type_) or \
+                functools.partial(super().validate_mapping, type_)
+            self._validators[type_] = validator
+        return validator
+
+    def validate_mapping(self, type_: Any, data: Mapping) -> Any:
+        return self.validator(type_)(data)
+
+    def serializer(self, type_: Any) -> Optional[Callable[[Any], str]]:
+        try:
+            return self._serializers[type_]
+        except KeyError:
+            serializer = self._serializers[type_] = compile_serializer(type_)
+            return serializer
+
+    def serialize(self, type_: Any, value: Any) -> Optional[bytes]:
+        serializer = self.serializer(type(value))
+        if serializer is None:
+            return super().serialize(type_, value)
+        return serializer(value).encode("utf-8")
+
+
+class TypeAdapterEngine(ValidationEngine):
+    """
+        TypedDicts and List[...] / Dict[...] containers, validated by a
+        cached pydantic type adapter into plain dicts and lists
+
+        class Todo(TypedDict):
+            task: str
+
+        @validate(body=List[Todo])
+    """
+
+    errors = (TypeError, ValidationError)
+    raw_json = PYDANTIC_V2
+    containers = (list, dict, tuple, set, frozenset)
+
+    def __init__(self) -> None:
+        self._adapters: Dict[Any, Any] = {}
+
+    def supports(self, type_: Any) -> bool:
+        return is_typeddict(type_) or get_origin(type_) in self.containers
+
+    def adapter(self, type_: Any) -> Any:
+        adapter = self._adapters.get(type_)
+        if adapter is None:
+            adapter = self._adapters[type_] = type_adapter(type_)
+        return adapter
+
+    def validate_bytes(self, type_: Any, data: bytes) -> Any:
+        if PYDANTIC_V2:
+            return adapter_validate_json(self.adapter(type_), data)
+        return super().validate_bytes(type_, data)
+
+    def validate_mapping(self, type_: Any, data: Mapping) -> Any:
+        if isinstance(data, Mapping) and type(data) is not dict:
+            # the values of a MultiDict are lists underneath
+            data = dict(data.items())
+        return adapter_validate(self.adapter(type_), data)
+
+    def serialize(self, type_: Any, value: Any) -> Optional[bytes]:
+        return adapter_dump_json(self.adapter(type_), value)
+
+    def to_builtins(self, type_: Any, value: Any) -> Any:
+        return adapter_builtins(self.adapter(type_), value)
+
+    def json_schema(self, type_: Any, ref_prefix: str) -> dict:
+        schema = adapter_schema(self.adapter(type_), ref_prefix)
+        definitions = schema.pop("definitions", {})
+        return _inline_ref(schema, definitions, ref_prefix)
+
+
+class MsgspecEngine(ValidationEngine):
+    """
+        msgspec Structs, decoded and validated from the raw body in one pass
+        and encoded straight to json bytes
+
+        class Todo(msgspec.Struct):
+            task: str
+            due: Optional[datetime] = None
+
+        it is registered for the Structs when msgspec is installed.
+    """
+
+    def __init__(self) -> None:
+        if msgspec is None:
+            raise RuntimeError("msgspec is not installed")
+        self.errors = (TypeError, msgspec.DecodeError)
+        self._encoder = msgspec.json.Encoder()
+        self._decoders: Dict[type, Any] = {}
+
+    def supports(self, type_: Any) -> bool:
+        return isinstance(type_, type) and issubclass(type_, msgspec.Struct)
+
+    def validate_bytes(self, type_: Any, data: bytes) -> Any:
+        decoder = self._decoders.get(type_)
+        if decoder is None:
+            decoder = self._decoders[type_] = msgspec.json.Decoder(type_)
+        return decoder.decode(data)
+
+    def validate_mapping(self, type_: Any, data: Mapping) -> Any:
+        # form and query values are strings, let them be coerced
+        if data is not None:
+            data = dict(data.items())
+        return msgspec.convert(data, type_, strict=False)
+
+    def serialize(self, type_: Any, value: Any) -> Optional[bytes]:
+        return self._encoder.encode(value)
+
+    def to_builtins(self, type_: Any, value: Any) -> Any:
+        return msgspec.to_builtins(value)
+
+    def json_schema(self, type_: Any, ref_prefix: str) -> dict:
+        (schema,), definitions = msgspec.json.schema_components(
+            (type_,), ref_template=f"{ref_prefix}{{name}}")
+        return _inline_ref(schema, definitions, ref_prefix)
+
+
+def _inline_ref(schema: dict, definitions: dict, ref_prefix: str) -> dict:
+    """
+    Replace a top level ref by its definition, unless the definition is
+    recursive, and keep the other definitions under "definitions".
+    """
+    ref = schema.get("$ref")
+    if ref is not None and ref not in json.dumps(definitions):
+        schema = definitions.pop(ref[len(ref_prefix):])
+    if definitions:
+        schema["definitions"] = definitions
+    return schema
+
+
+default_engine = PydanticEngine()
+_engines: List[ValidationEngine] = []
+
+
+def register_engine(engine: ValidationEngine) -> None:
+    """Let the engine handle the types it supports ahead of pydantic."""
+    if engine not in _engines:
+        _engines.insert(0, engine)
+
+
+def engine_for(
+    type_: PydanticModel,
+    engine: Optional[ValidationEngine] = None
+) -> ValidationEngine:
+    """The given engine if it supports the type, else the registered one."""
+    if engine is not None and engine.supports(type_):
+        return engine
+    for registered in _engines:
+        if registered.supports(type_):
+            return registered
+    return default_engine
+
+
+register_engine(TypeAdapterEngine())
+if msgspec is not None:
+    register_engine(MsgspecEngine())
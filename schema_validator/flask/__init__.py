@@ -1,8 +1,10 @@
-from .api import openapi, swagger_ui
+from .api import openapi, openapi_component, swagger_static, swagger_ui
 from .validation import validate
 
 __all__ = [
     "openapi",
+    "openapi_component",
+    "swagger_static",
     "swagger_ui",
     "validate"
 ]
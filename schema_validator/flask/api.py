@@ -1,21 +1,63 @@
 from typing import Optional
 
-from flask import current_app, render_template_string
+from flask import Response, abort, current_app, request
 
-from schema_validator.constants import SWAGGER_TEMPLATE
+from schema_validator.assets import IMMUTABLE_CACHE_CONTROL
+from schema_validator.cache import CachedDocument
 
 
-def openapi(validator, tag: Optional[str] = None) -> dict:
-    from ..core import _build_openapi_schema
-    return _build_openapi_schema(current_app, validator, tag)
+def cached_response(
+    document: CachedDocument,
+    mimetype: str,
+    cache_control: Optional[str] = None
+) -> Response:
+    body, etag, encoding = document.negotiate(request.accept_encodings)
 
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        if isinstance(body, memoryview):
+            # a sequence keeps the shared pages from being copied
+            body = [body]
+        response = current_app.response_class(body, mimetype=mimetype)
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = cache_control or current_app.config[
+        "SCHEMA_OPENAPI_CACHE_CONTROL"]
+    return response
 
-def swagger_ui(validator, tag: Optional[str] = None) -> str:
-    path = f"/swagger/openapi-{tag}.json" if tag else validator.openapi_path
-    return render_template_string(
-        SWAGGER_TEMPLATE,
-        title=validator.title,
-        openapi_path=path,
-        swagger_js_url=current_app.config["SCHEMA_SWAGGER_JS_URL"],
-        swagger_css_url=current_app.config["SCHEMA_SWAGGER_CSS_URL"],
-    )
+
+def openapi(validator, tag: Optional[str] = None) -> Response:
+    if tag is not None and not validator.endpoints.has_tag(tag):
+        abort(404)
+    if current_app.config["SCHEMA_OPENAPI_STREAM"]:
+        return current_app.response_class(
+            validator.stream_openapi_document(current_app, tag),
+            mimetype="application/json"
+        )
+    document = validator.openapi_document(current_app, tag)
+    return cached_response(document, "application/json")
+
+
+def openapi_component(validator, name: str) -> Response:
+    document = validator.component_document(current_app, name)
+    if document is None:
+        abort(404)
+    return cached_response(document, "application/json")
+
+
+def swagger_ui(validator, tag: Optional[str] = None) -> Response:
+    document = validator.swagger_ui_document(current_app, tag)
+    if document is None:
+        abort(404)
+    return cached_response(document, "text/html")
+
+
+def swagger_static(validator, filename: str) -> Response:
+    asset = validator.swagger_assets.get(filename)
+    if asset is None:
+        abort(404)
+    document, mimetype = asset
+    return cached_response(document, mimetype, IMMUTABLE_CACHE_CONTROL)
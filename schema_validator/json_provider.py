@@ -0,0 +1,228 @@
+import json
+from collections.abc import Mapping
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, Dict, Tuple
+
+from humps import camelize, decamelize
+from pydantic import BaseModel
+
+from schema_validator.cache import CacheInfo, LRUCache
+from schema_validator.compat import ENCODERS_BY_TYPE, model_dict, \
+    pydantic_encoder
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from quart.json import JSONDecoder, JSONEncoder
+except ImportError:
+    try:
+        from flask.json import JSONDecoder, JSONEncoder
+    except ImportError:
+        # flask >= 2.3 and quart >= 0.19 only have json providers
+        from json import JSONDecoder, JSONEncoder
+
+JSON_BACKENDS = ("json", "orjson")
+
+
+class JSONDefault:
+    """
+        a json default() which looks the conversion of each type up once
+
+        the conversions are the ones of pydantic_encoder, which searches
+        them again for every object it is given
+    """
+
+    def __init__(self) -> None:
+        self._conversions: Dict[type, Callable[[Any], Any]] = {}
+
+    def __call__(self, object_: Any) -> Any:
+        try:
+            conversion = self._conversions[type(object_)]
+        except KeyError:
+            conversion = _conversion(type(object_))
+            self._conversions[type(object_)] = conversion
+        return conversion(object_)
+
+
+def _conversion(type_: type) -> Callable[[Any], Any]:
+    if issubclass(type_, BaseModel):
+        return model_dict
+    if is_dataclass(type_):
+        return asdict
+    for base in type_.__mro__[:-1]:
+        if base in ENCODERS_BY_TYPE:
+            return ENCODERS_BY_TYPE[base]
+    return pydantic_encoder
+
+
+json_default = JSONDefault()
+
+
+_MISSING = object()
+
+
+class KeyConverter:
+    """
+        humps camelize / decamelize of the keys of json values, rebuilding
+        the dicts and lists in one pass and memoizing the converted keys
+
+        camelize_keys({"snake_case": [{"other_key": 1}]})
+        camelize_keys.key("snake_case")
+        camelize_keys.cache.info().hit_ratio
+
+        the keys of a json body come from a small set, so the regexes of
+        humps run once per key instead of once per key of every request.
+        only str keys are memoized, the others are left to humps.
+    """
+
+    def __init__(self, convert: Callable[[Any], Any], maxsize: int = 4096):
+        self.convert = convert
+        self.cache = LRUCache(maxsize)
+
+    def key(self, key: Any) -> Any:
+        if type(key) is not str:
+            return self.convert(key)
+        converted = self.cache.get(key, _MISSING)
+        if converted is _MISSING:
+            converted = self.convert(key)
+            self.cache.set(key, converted)
+        return converted
+
+    def __call__(self, value: Any) -> Any:
+        if type(value) is dict or isinstance(value, Mapping):
+            key = self.key
+            return {key(k): self(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self(item) for item in value]
+        return value
+
+
+camelize_keys = KeyConverter(camelize)
+decamelize_keys = KeyConverter(decamelize)
+
+
+def casing_cache_info() -> Dict[str, CacheInfo]:
+    """The hits, misses and sizes of the memoized casing of keys."""
+    return {
+        "camelize": camelize_keys.cache.info(),
+        "decamelize": decamelize_keys.cache.info(),
+    }
+
+
+class PydanticJSONEncoder(JSONEncoder):
+    def default(self, object_: Any) -> Any:
+        return json_default(object_)
+
+
+class CasingJSONEncoder(PydanticJSONEncoder):
+    def encode(self, object_: Any) -> Any:
+        return super().encode(camelize_keys(object_))
+
+
+class CasingJSONDecoder(JSONDecoder):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, object_hook=self.object_hook, **kwargs)
+
+    @staticmethod
+    def object_hook(object_: dict) -> Any:
+        # the nested objects were converted by their own hook already
+        key = decamelize_keys.key
+        return {key(k): v for k, v in object_.items()}
+
+
+class SchemaJSONProvider:
+    """
+        the json provider installed as app.json (flask >= 2.2 and
+        quart >= 0.18), mixed into the provider class of the app
+
+        backend: "json", or "orjson" which writes the bytes of responses
+            without a str in between (its output is always utf-8)
+        convert_casing: camelize the keys of the dumped and decamelize the
+            keys of the loaded objects
+
+        one encoder is kept per set of dumps() arguments and the default()
+        of every type is resolved once.
+    """
+
+    backend = "json"
+    convert_casing = False
+    default = staticmethod(json_default)
+
+    def __init__(self, app) -> None:
+        super().__init__(app)
+        self._encoders: Dict[Tuple, json.JSONEncoder] = {}
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        if self.convert_casing:
+            obj = camelize_keys(obj)
+        if self.backend == "orjson":
+            return self._orjson_dumps(obj, **kwargs).decode("utf-8")
+        kwargs.setdefault("default", self.default)
+        kwargs.setdefault("ensure_ascii", self.ensure_ascii)
+        kwargs.setdefault("sort_keys", self.sort_keys)
+        return self._encoder(kwargs).encode(obj)
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        if self.backend == "orjson" and not kwargs:
+            obj = orjson.loads(s)
+        else:
+            obj = super().loads(s, **kwargs)
+        return decamelize_keys(obj) if self.convert_casing else obj
+
+    def response(self, *args: Any, **kwargs: Any) -> Any:
+        if self.backend != "orjson":
+            return super().response(*args, **kwargs)
+        obj = self._prepare_response_obj(args, kwargs)
+        if self.convert_casing:
+            obj = camelize_keys(obj)
+        indent = None
+        if (self.compact is None and self._app.debug) or \
+                self.compact is False:
+            indent = 2
+        return self._app.response_class(
+            self._orjson_dumps(obj, indent=indent) + b"\n",
+            mimetype=self.mimetype
+        )
+
+    def _encoder(self, kwargs: Dict[str, Any]) -> json.JSONEncoder:
+        cls = kwargs.pop("cls", None) or json.JSONEncoder
+        try:
+            key = (cls, *sorted(kwargs.items()))
+            encoder = self._encoders.get(key)
+        except TypeError:
+            return cls(**kwargs)
+        if encoder is None:
+            encoder = self._encoders[key] = cls(**kwargs)
+        return encoder
+
+    def _orjson_dumps(self, obj: Any, **kwargs: Any) -> bytes:
+        option = orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(
+            obj, default=kwargs.get("default", self.default), option=option)
+
+
+_provider_classes: Dict[type, type] = {}
+
+
+def json_provider(app, backend: str = "json", convert_casing: bool = False):
+    """A SchemaJSONProvider for the app, based on its json_provider_class."""
+    if backend not in JSON_BACKENDS:
+        raise ValueError(f"unknown json backend: {backend}")
+    if backend == "orjson" and orjson is None:
+        raise RuntimeError("orjson is not installed")
+    base = app.json_provider_class
+    cls = _provider_classes.get(base)
+    if cls is None:
+        cls = type(f"Schema{base.__name__}", (SchemaJSONProvider, base), {})
+        _provider_classes[base] = cls
+    provider = cls(app)
+    provider.backend = backend
+    provider.convert_casing = convert_casing
+    return provider
@@ -1,8 +1,11 @@
-from .api import openapi, swagger_ui, convert_model_result
+from .api import openapi, openapi_component, swagger_static, swagger_ui, \
+    convert_model_result
 from .validation import validate
 
 __all__ = [
     "openapi",
+    "openapi_component",
+    "swagger_static",
     "swagger_ui",
     "validate",
     "convert_model_result"
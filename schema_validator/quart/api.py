@@ -1,13 +1,16 @@
+import asyncio
 import inspect
 
-from typing import Optional, Callable
+from typing import AsyncIterator, Iterator, Optional, Callable
 from functools import wraps
-from dataclasses import is_dataclass, asdict
-from pydantic import BaseModel
 
-from quart import current_app, render_template_string
+from quart import Response, abort, current_app, request
 
-from schema_validator.constants import SWAGGER_TEMPLATE
+from schema_validator.assets import IMMUTABLE_CACHE_CONTROL
+from schema_validator.cache import CachedDocument
+from schema_validator.casing import camelized_json
+from schema_validator.engines import engine_for
+from .validation import json_response
 
 
 def convert_model_result(func: Callable) -> Callable:
@@ -20,30 +23,117 @@ def convert_model_result(func: Callable) -> Callable:
         else:
             value = result
 
-        if is_dataclass(value):
-            dict_or_value = asdict(value)
-        elif isinstance(value, BaseModel):
-            dict_or_value = value.dict()
-        elif inspect.iscoroutine(value):
-            dict_or_value = await value
-        else:
-            dict_or_value = value
-        return await func((dict_or_value, status_or_headers, headers))
+        if inspect.iscoroutine(value):
+            value = await value
+        type_ = type(value)
+        validator = current_app.extensions.get("SCHEMA_VALIDATOR")
+        engine = engine_for(type_, validator and validator.engine)
+        if engine.supports(type_):
+            # models are encoded to a response directly when they can be
+            if validator and validator.convert_casing:
+                body = camelized_json(
+                    type_, engine.to_builtins(type_, value), engine)
+            else:
+                body = engine.serialize(type_, value)
+            if body is not None:
+                return json_response(body, status_or_headers, headers)
+            value = engine.to_builtins(type_, value)
+        return await func((value, status_or_headers, headers))
 
     return decorator
 
 
-async def openapi(validator, tag: Optional[str] = None) -> dict:
-    from ..core import _build_openapi_schema
-    return _build_openapi_schema(current_app, validator, tag)
+def cached_response(
+    document: CachedDocument,
+    mimetype: str,
+    cache_control: Optional[str] = None
+) -> Response:
+    body, etag, encoding = document.negotiate(request.accept_encodings)
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(b"", status=304)
+    else:
+        if isinstance(body, memoryview):
+            # an async iterator keeps the shared pages from being copied,
+            # a sync one would be read in the executor
+            response = current_app.response_class(
+                _iter_view(body), mimetype=mimetype)
+            response.content_length = len(body)
+        else:
+            response = current_app.response_class(body, mimetype=mimetype)
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    response.headers["Cache-Control"] = cache_control or current_app.config[
+        "SCHEMA_OPENAPI_CACHE_CONTROL"]
+    return response
+
+
+async def _iter_view(body: memoryview) -> AsyncIterator[memoryview]:
+    yield body
+
+
+STREAM_CHUNK_SIZE = 1 << 16
+
+
+def _read_chunks(iterator: Iterator[bytes]) -> bytes:
+    """The next chunks joined up to about STREAM_CHUNK_SIZE, b"" at the end."""
+    chunks = []
+    size = 0
+    for chunk in iterator:
+        chunks.append(chunk)
+        size += len(chunk)
+        if size >= STREAM_CHUNK_SIZE:
+            break
+    return b"".join(chunks)
+
+
+async def _stream_in_executor(
+    iterator: Iterator[bytes]
+) -> AsyncIterator[bytes]:
+    """
+    The chunks of a sync generator, which builds the document, read in the
+    default executor so that the event loop is not blocked by it.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        chunk = await loop.run_in_executor(None, _read_chunks, iterator)
+        if not chunk:
+            return
+        yield chunk
+
+
+async def openapi(validator, tag: Optional[str] = None) -> Response:
+    if tag is not None and not validator.endpoints.has_tag(tag):
+        abort(404)
+    if current_app.config["SCHEMA_OPENAPI_STREAM"]:
+        return current_app.response_class(
+            _stream_in_executor(
+                validator.stream_openapi_document(current_app, tag)),
+            mimetype="application/json"
+        )
+    document = await validator.openapi_document_async(current_app, tag)
+    return cached_response(document, "application/json")
+
+
+async def openapi_component(validator, name: str) -> Response:
+    document = await validator.component_document_async(current_app, name)
+    if document is None:
+        abort(404)
+    return cached_response(document, "application/json")
+
+
+async def swagger_ui(validator, tag: Optional[str] = None) -> Response:
+    document = validator.swagger_ui_document(current_app, tag)
+    if document is None:
+        abort(404)
+    return cached_response(document, "text/html")
 
 
-async def swagger_ui(validator, tag: Optional[str] = None) -> str:
-    path = f"/swagger/openapi-{tag}.json" if tag else validator.openapi_path
-    return await render_template_string(
-        SWAGGER_TEMPLATE,
-        title=validator.title,
-        openapi_path=path,
-        swagger_js_url=current_app.config["SCHEMA_SWAGGER_JS_URL"],
-        swagger_css_url=current_app.config["SCHEMA_SWAGGER_CSS_URL"],
-    )
+async def swagger_static(validator, filename: str) -> Response:
+    asset = validator.swagger_assets.get(filename)
+    if asset is None:
+        abort(404)
+    document, mimetype = asset
+    return cached_response(document, mimetype, IMMUTABLE_CACHE_CONTROL)
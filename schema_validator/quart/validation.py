@@ -1,23 +1,148 @@
 from dataclasses import asdict, is_dataclass
 from functools import wraps
-from typing import (Any, Callable, Dict, Iterable, List, Optional, Union, cast)
+from typing import (Any, Callable, Dict, Iterable, List, Optional, Union)
 
-from pydantic import BaseModel, ValidationError
-from pydantic.dataclasses import is_builtin_dataclass
 from quart import Response, current_app, g, jsonify, request
 from werkzeug.datastructures import Headers
 from werkzeug.exceptions import BadRequest
 
+from schema_validator.cache import CachedResponse, InputMemo, ResponseCache
+from schema_validator.casing import camelized_json, decamelized_json
 from schema_validator.constants import (
-    SCHEMA_QUERYSTRING_ATTRIBUTE, SCHEMA_REQUEST_ATTRIBUTE,
-    SCHEMA_RESPONSE_ATTRIBUTE, SCHEMA_TAG_ATTRIBUTE
+    JSON_CONTENT_TYPE, SCHEMA_ENGINE_ATTRIBUTE, SCHEMA_QUERYSTRING_ATTRIBUTE,
+    SCHEMA_REQUEST_ATTRIBUTE, SCHEMA_RESPONSE_ATTRIBUTE, SCHEMA_TAG_ATTRIBUTE
 )
+from schema_validator.engines import ValidationEngine, engine_for
 from schema_validator.types import PydanticModel
 from schema_validator.utils import DataSource, check_body_schema, \
-    check_query_string_schema, check_response_schema
+    check_memo_schema, check_query_string_schema, check_response_schema
+
+
+def _convert_casing() -> bool:
+    validator = current_app.extensions.get("SCHEMA_VALIDATOR")
+    return validator is not None and validator.convert_casing
+
+
+def _engine(
+    type_: PydanticModel,
+    engine: Optional[ValidationEngine]
+) -> ValidationEngine:
+    if engine is None:
+        validator = current_app.extensions.get("SCHEMA_VALIDATOR")
+        engine = validator.engine if validator is not None else None
+    return engine_for(type_, engine)
+
+
+async def _decamelized_json(
+    type_: PydanticModel,
+    engine: ValidationEngine
+) -> Any:
+    """The json body with the keys the type declares, the body is left to
+    get_json() when it is not json."""
+    if not request.is_json:
+        return await request.get_json()
+    data = await request.get_data()
+    try:
+        return decamelized_json(type_, data, engine)
+    except ValueError as e:
+        return request.on_json_loading_failed(e)
+
+
+async def _validate_json(
+    type_: PydanticModel,
+    engine: ValidationEngine
+) -> Any:
+    if _convert_casing():
+        return engine.validate_mapping(
+            type_, await _decamelized_json(type_, engine))
+    if engine.raw_json and request.is_json:
+        return engine.validate_bytes(type_, await request.get_data())
+    return engine.validate_mapping(type_, await request.get_json())
+
+
+def json_response(
+    body: bytes,
+    status_or_headers: Union[None, int, str, Dict, List, Headers] = None,
+    headers: Optional[Headers] = None
+) -> Response:
+    """A response of encoded json, with the status and headers a view
+    may return along with its value."""
+    if isinstance(status_or_headers, (Headers, dict, list)):
+        headers, status_or_headers = status_or_headers, None
+    return current_app.response_class(
+        body, status=status_or_headers, headers=headers,
+        content_type=JSON_CONTENT_TYPE
+    )
+
+
+def _cache_key(
+    cache: ResponseCache,
+    query_string: Optional[PydanticModel],
+    engine: Optional[ValidationEngine]
+) -> Optional[str]:
+    """The key of the response of a GET request, None for the requests
+    which may get a response of their own (credentials, cookies)."""
+    if request.method != "GET" or "Authorization" in request.headers or \
+            "Cookie" in request.headers:
+        return None
+    if query_string:
+        query = _engine(query_string, engine).to_builtins(
+            query_string, g.query_params)
+    else:
+        # no model normalizes the query string, so all of it is the key
+        query = request.query_string.decode("latin-1")
+    return cache.key(request.endpoint, request.view_args, query)
+
 
+def _cached_response(cached: CachedResponse) -> Response:
+    document = cached.document
+    body, etag, encoding = document.negotiate(request.accept_encodings)
 
-async def check_response(result, response_model: Dict[int, PydanticModel]):
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(b"", status=304)
+    else:
+        response = current_app.response_class(
+            body, status=cached.status, headers=cached.headers)
+        if encoding is not None:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+async def _cache_response(
+    cache: ResponseCache,
+    key: str,
+    response: Response
+) -> Response:
+    """Keep a complete, shareable 200 response, and serve it from the
+    cache."""
+    if (
+        response.status_code != 200
+        or any(value.lower() != "accept-encoding" for value in response.vary)
+        or not isinstance(
+            response.response, response.data_body_class)
+        or "Set-Cookie" in response.headers
+        or "Content-Encoding" in response.headers
+        or response.cache_control.private
+        or response.cache_control.no_store
+        or response.cache_control.no_cache
+    ):
+        return response
+    headers = [
+        (name, value) for name, value in response.headers.items()
+        if name != "Content-Length"
+    ]
+    cached = cache.set(
+        key, response.status_code, headers, await response.get_data())
+    return _cached_response(cached)
+
+
+async def check_response(
+    result,
+    response_model: Dict[int, PydanticModel],
+    engine: Optional[ValidationEngine] = None
+):
     status_or_headers: Union[None, int, str, Dict, List] = None
     headers: Optional[Headers] = None
 
@@ -41,22 +166,34 @@ async def check_response(result, response_model: Dict[int, PydanticModel]):
     for status_code, model_cls in response_model.items():
         if status_code != status:
             continue
-        if isinstance(value, dict):
+        model_engine = _engine(model_cls, engine)
+        if isinstance(value, (dict, list)):
             try:
-                model_value = model_cls(**value)
-            except (TypeError, ValidationError) as ve:
+                model_value = model_engine.validate_mapping(model_cls, value)
+            except model_engine.errors as ve:
                 return jsonify(validation_error=str(ve)), bad_status
         elif type(value) == model_cls:
             model_value = value
-        elif is_builtin_dataclass(value):
-            model_value = model_cls(**asdict(value))
+        elif is_dataclass(value) and not isinstance(value, type):
+            # not is_builtin_dataclass, pydantic 1.10 marks the dataclasses
+            # it wraps
+            model_value = model_engine.validate_mapping(
+                model_cls, asdict(value))
         else:
             return jsonify(validation_error="invalid response"), bad_status
-        if is_dataclass(model_value):
-            return asdict(model_value), status_or_headers, headers
+        if _convert_casing():
+            # the keys are camelized by the table of the model
+            body = camelized_json(model_cls, model_engine.to_builtins(
+                model_cls, model_value), model_engine)
         else:
-            model_value = cast(BaseModel, model_value)
-            return model_value.dict(), status_or_headers, headers
+            body = model_engine.serialize(model_cls, model_value)
+        if body is not None:
+            return json_response(body, status_or_headers, headers)
+        value = model_engine.to_builtins(model_cls, model_value)
+        if not isinstance(value, dict):
+            # only dicts are made json responses by the app
+            value = jsonify(value)
+        return value, status_or_headers, headers
     return result
 
 
@@ -67,7 +204,10 @@ def validate(
     validate_path_args: bool = False,
     responses: Union[PydanticModel, Dict[int, PydanticModel], None] = None,
     headers: Optional[PydanticModel] = None,
-    tags: Optional[Iterable[str]] = None
+    tags: Optional[Iterable[str]] = None,
+    engine: Optional[ValidationEngine] = None,
+    memo: Optional[InputMemo] = None,
+    cache: Optional[ResponseCache] = None
 ) -> Callable:
     """
     params:
@@ -79,6 +219,15 @@ def validate(
             the body source
         response:
             response model define
+        engine:
+            the ValidationEngine of the endpoint, by default the engine of
+            the SchemaValidator or the one registered for the types
+        memo:
+            an InputMemo of the validated query strings and json bodies,
+            their models must be frozen
+        cache:
+            a ResponseCache of the GET responses, keyed by the endpoint,
+            the path arguments and the validated query string
 
     from dataclasses import dataclass
     from datetime import datetime
@@ -135,14 +284,20 @@ def validate(
     if headers is not None:
         pass
 
+    if memo is not None:
+        if query_string is not None:
+            check_memo_schema(query_string)
+        if body is not None and source != DataSource.FORM:
+            check_memo_schema(body)
+
     if query_string is not None:
-        query_string = check_query_string_schema(query_string)
+        query_string = check_query_string_schema(query_string, engine)
 
     if body is not None:
-        body = check_body_schema(body, source)
+        body = check_body_schema(body, source, engine)
 
     if responses is not None:
-        responses = check_response_schema(responses)
+        responses = check_response_schema(responses, engine)
 
     def decorator(func: Callable) -> Callable:
 
@@ -154,27 +309,46 @@ def validate(
             setattr(func, SCHEMA_RESPONSE_ATTRIBUTE, responses)
         if tags:
             setattr(func, SCHEMA_TAG_ATTRIBUTE, list(set(tags)))
+        if engine is not None:
+            setattr(func, SCHEMA_ENGINE_ATTRIBUTE, engine)
 
         @wraps(func)
         async def wrapper(*args: Any, **kwargs: Any) -> Any:
             err = {}
             if body:
-                if source == DataSource.JSON:
-                    data = await request.get_json()
-                else:
-                    data = await request.form
-
+                body_engine = _engine(body, engine)
                 try:
-                    body_model = body(**data)
-                except (TypeError, ValidationError) as ve:
+                    if source == DataSource.FORM:
+                        body_model = body_engine.validate_mapping(
+                            body, await request.form)
+                    elif memo is None or not request.is_json:
+                        body_model = await _validate_json(body, body_engine)
+                    else:
+                        key = memo.key(body, await request.get_data())
+                        body_model = memo.get(key)
+                        if body_model is None:
+                            body_model = await _validate_json(
+                                body, body_engine)
+                            memo.set(key, body_model)
+                except body_engine.errors as ve:
                     err["body_params"] = str(ve)
                 else:
                     g.body_params = body_model
 
             if query_string:
+                query_engine = _engine(query_string, engine)
                 try:
-                    query_params = query_string(**request.args)
-                except (TypeError, ValidationError) as ve:
+                    if memo is None:
+                        query_params = query_engine.validate_mapping(
+                            query_string, request.args)
+                    else:
+                        key = memo.key(query_string, request.query_string)
+                        query_params = memo.get(key)
+                        if query_params is None:
+                            query_params = query_engine.validate_mapping(
+                                query_string, request.args)
+                            memo.set(key, query_params)
+                except query_engine.errors as ve:
                     err["query_params"] = str(ve)
                 else:
                     g.query_params = query_params
@@ -182,10 +356,21 @@ def validate(
             if err:
                 return jsonify(validation_error=err), BadRequest.code
 
+            cache_key = None
+            if cache is not None:
+                cache_key = _cache_key(cache, query_string, engine)
+            if cache_key is not None:
+                cached = cache.get(cache_key)
+                if cached is not None:
+                    return _cached_response(cached)
+
             result = await current_app.ensure_async(func)(*args, **kwargs)
 
             if responses:
-                return await check_response(result, responses)
+                result = await check_response(result, responses, engine)
+            if cache_key is not None:
+                return await _cache_response(
+                    cache, cache_key, await current_app.make_response(result))
             return result
 
         return wrapper
@@ -0,0 +1,263 @@
+import logging
+import pickle
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional,
+    Tuple
+)
+
+from humps import camelize
+from schema_validator.engines import ValidationEngine, engine_for
+from schema_validator.constants import (
+    IGNORE_ENDPOINTS, IGNORE_METHODS, REF_PREFIX, SCHEMA_ENGINE_ATTRIBUTE,
+    SCHEMA_QUERYSTRING_ATTRIBUTE, SCHEMA_REQUEST_ATTRIBUTE,
+    SCHEMA_RESPONSE_ATTRIBUTE, SCHEMA_TAG_ATTRIBUTE
+)
+from schema_validator.types import PydanticModel
+
+logger = logging.getLogger(__name__)
+
+
+class ModelRegistry:
+    """
+        map every user type to one pydantic model and memoize its schema,
+        per engine handling the type
+
+        model_registry.model(SomeDataclass)  # the same model on every call
+        model_registry.schema(SomeModel, camel=True)
+        model_registry.schema(Point, engine=PointEngine())
+    """
+
+    def __init__(self) -> None:
+        self._models: Dict[Tuple[Any, ValidationEngine], PydanticModel] = {}
+        self._schemas: Dict[Tuple[Any, bool, ValidationEngine], dict] = {}
+        self._lock = threading.Lock()
+
+    def model(
+        self,
+        type_: PydanticModel,
+        engine: Optional[ValidationEngine] = None
+    ) -> PydanticModel:
+        engine = engine_for(type_, engine)
+        model = self._models.get((type_, engine))
+        if model is not None:
+            return model
+        with self._lock:
+            model = self._models.get((type_, engine))
+            if model is None:
+                model = engine.prepare(type_)
+                self._models[(type_, engine)] = model
+                self._models.setdefault((model, engine), model)
+        return model
+
+    def schema(
+        self,
+        model: PydanticModel,
+        camel: bool = False,
+        engine: Optional[ValidationEngine] = None
+    ) -> dict:
+        """
+        The schema of the model with refs to REF_PREFIX, the returned dict
+        is shared and must not be modified.
+        """
+        engine = engine_for(model, engine)
+        key = (model, camel, engine)
+        schema = self._schemas.get(key)
+        if schema is None:
+            schema = self._store(
+                key, engine.json_schema(model, REF_PREFIX))
+        return schema
+
+    def prefetch(
+        self,
+        models: Iterable[PydanticModel],
+        camel: bool = False,
+        workers: Optional[int] = None,
+        engine: Optional[ValidationEngine] = None
+    ) -> None:
+        """
+        Generate the schemas of the models in a process pool, stored for
+        the engine schema() is then given (the one of the endpoints or of
+        the app), the models or engines which can not be sent to the
+        workers are left to schema().
+        """
+        engines: Dict[ValidationEngine, bool] = {}
+        pending = []
+        for model in dict.fromkeys(models):
+            model_engine = engine_for(model, engine)
+            if model_engine not in engines:
+                engines[model_engine] = _can_pickle(model_engine)
+            if (model, camel, model_engine) not in self._schemas and \
+                    model_engine.supports(model) and \
+                    engines[model_engine] and _picklable(model):
+                pending.append((model, model_engine))
+        if not pending:
+            return
+        try:
+            with ProcessPoolExecutor(workers) as pool:
+                schemas = list(pool.map(_model_schema, *zip(*pending)))
+        except Exception as e:
+            logger.warning(f"prefetch schemas in processes failed: {e}")
+            return
+        for (model, model_engine), schema in zip(pending, schemas):
+            self._store((model, camel, model_engine), schema)
+
+    def _store(
+        self,
+        key: Tuple[Any, bool, ValidationEngine],
+        schema: dict
+    ) -> dict:
+        if key[1]:
+            schema = _camelize_schema(schema)
+        self._schemas[key] = schema
+        return schema
+
+    def clear(self) -> None:
+        with self._lock:
+            self._models.clear()
+            self._schemas.clear()
+
+
+def _model_schema(
+    model: PydanticModel,
+    engine: ValidationEngine
+) -> dict:
+    return engine.json_schema(model, REF_PREFIX)
+
+
+def _picklable(model: PydanticModel) -> bool:
+    try:
+        return pickle.loads(pickle.dumps(model)) is model
+    except Exception:
+        return False
+
+
+def _can_pickle(value: Any) -> bool:
+    try:
+        pickle.dumps(value)
+    except Exception:
+        return False
+    return True
+
+
+def _camelize_schema(schema: dict) -> dict:
+    # definition names are the targets of refs, so they keep their case
+    schema = schema.copy()
+    definitions = schema.pop("definitions", None)
+    schema = camelize(schema)
+    if definitions is not None:
+        schema["definitions"] = {
+            name: camelize(definition)
+            for name, definition in definitions.items()
+        }
+    return schema
+
+
+model_registry = ModelRegistry()
+
+
+class Endpoint(NamedTuple):
+    """
+        the schema metadata of one (endpoint, method)
+
+        function: the handler, the method of the view class if any
+        rules: every url rule routed to the endpoint
+    """
+    endpoint: str
+    method: str
+    rules: Tuple[Any, ...]
+    view_func: Callable
+    function: Callable
+    tags: Tuple[str, ...]
+    request: Optional[Tuple[PydanticModel, Any]]
+    query_string: Optional[PydanticModel]
+    responses: Dict[int, PydanticModel]
+    engine: Optional[ValidationEngine] = None
+
+
+class EndpointRegistry:
+    """
+        the validated endpoints of an app with a tag index
+
+        validator.endpoints.get("index", "POST")
+        validator.endpoints.for_tag("SOME-TAG")
+    """
+
+    def __init__(self) -> None:
+        self._endpoints: Dict[Tuple[str, str], Endpoint] = {}
+        self._tags: Dict[str, Dict[Tuple[str, str], None]] = {}
+        self.version = 0
+
+    def add(self, rule, view_func: Callable) -> None:
+        if rule.endpoint in IGNORE_ENDPOINTS:
+            return
+        view_class = getattr(view_func, "view_class", None)
+        tags = tuple(
+            getattr(view_class or view_func, SCHEMA_TAG_ATTRIBUTE, [])
+        )
+
+        for method in sorted((rule.methods or set()) - IGNORE_METHODS):
+            key = (rule.endpoint, method)
+            function = None
+            if view_class is not None:
+                function = getattr(view_class, method.lower(), None)
+            function = function or view_func
+
+            rules: Tuple[Any, ...] = (rule,)
+            current = self._endpoints.get(key)
+            if current is not None and current.view_func is view_func:
+                rules = current.rules + rules
+            self._remove(key)
+            self._endpoints[key] = Endpoint(
+                endpoint=rule.endpoint,
+                method=method,
+                rules=rules,
+                view_func=view_func,
+                function=function,
+                tags=tags,
+                request=getattr(function, SCHEMA_REQUEST_ATTRIBUTE, None),
+                query_string=getattr(
+                    function, SCHEMA_QUERYSTRING_ATTRIBUTE, None),
+                responses=getattr(function, SCHEMA_RESPONSE_ATTRIBUTE, {}),
+                engine=getattr(function, SCHEMA_ENGINE_ATTRIBUTE, None),
+            )
+            for tag in tags:
+                self._tags.setdefault(tag, {})[key] = None
+        self.version += 1
+
+    def _remove(self, key: Tuple[str, str]) -> None:
+        current = self._endpoints.pop(key, None)
+        if current is not None:
+            for tag in current.tags:
+                self._tags[tag].pop(key, None)
+
+    def get(self, endpoint: str, method: str) -> Optional[Endpoint]:
+        return self._endpoints.get((endpoint, method.upper()))
+
+    def for_tag(self, tag: str) -> List[Endpoint]:
+        return [self._endpoints[key] for key in self._tags.get(tag, ())]
+
+    @property
+    def tags(self) -> List[str]:
+        return [tag for tag, keys in self._tags.items() if keys]
+
+    def has_tag(self, tag: str) -> bool:
+        return bool(self._tags.get(tag))
+
+    def models(self) -> List[PydanticModel]:
+        """Every request, query string and response model in use."""
+        models: Dict[Any, None] = {}
+        for entry in self._endpoints.values():
+            if entry.request is not None:
+                models[entry.request[0]] = None
+            if entry.query_string is not None:
+                models[entry.query_string] = None
+            models.update(dict.fromkeys(entry.responses.values()))
+        return list(models)
+
+    def __iter__(self) -> Iterator[Endpoint]:
+        return iter(list(self._endpoints.values()))
+
+    def __len__(self) -> int:
+        return len(self._endpoints)
@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Tuple, Type, TypedDict, Union
+from typing import Any, Dict, List, Optional, Tuple, Type, TypedDict, Union
 from dataclasses import dataclass
 
 from pydantic import BaseModel
@@ -18,7 +18,8 @@ except ImportError:
         StatusCode,
     )
 
-PydanticModel = Union[Type[BaseModel], Type]
+# models, dataclasses, TypedDicts and List[...] / Dict[...] aliases
+PydanticModel = Union[Type[BaseModel], Type, Any]
 
 ResponseValue = Union[FlaskResponseValue, PydanticModel]
 
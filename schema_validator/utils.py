@@ -1,11 +1,10 @@
 from enum import Enum, auto
-from typing import Callable, Dict, Iterable, Union
-
-from pydantic.dataclasses import dataclass as pydantic_dataclass, \
-    is_builtin_dataclass
-from pydantic.schema import model_schema
+from typing import Callable, Dict, Iterable, Optional, Union
 
+from schema_validator.compat import is_frozen
 from schema_validator.constants import SCHEMA_TAG_ATTRIBUTE
+from schema_validator.engines import ValidationEngine
+from schema_validator.registry import model_registry
 from schema_validator.types import PydanticModel
 
 
@@ -18,45 +17,66 @@ class DataSource(Enum):
     JSON = auto()
 
 
-def check_query_string_schema(query_string: PydanticModel) -> PydanticModel:
-    if is_builtin_dataclass(query_string):
-        query_string = pydantic_dataclass(query_string).__pydantic_model__
-    return query_string
+def check_query_string_schema(
+    query_string: PydanticModel,
+    engine: Optional[ValidationEngine] = None
+) -> PydanticModel:
+    return model_registry.model(query_string, engine)
 
 
 def check_body_schema(
     body: PydanticModel,
-    source: DataSource
+    source: DataSource,
+    engine: Optional[ValidationEngine] = None
 ) -> PydanticModel:
-    if is_builtin_dataclass(body):
-        body = pydantic_dataclass(body).__pydantic_model__
-
-    schema = model_schema(body)
-    if source == DataSource.FORM and any(
-        schema["properties"][field]["type"] == "object" for field in
-            schema["properties"]
+    body = model_registry.model(body, engine)
+
+    schema = model_registry.schema(body, engine=engine)
+    definitions = schema.get("definitions", {})
+    if source != DataSource.FORM:
+        return body
+    if schema.get("type") != "object":
+        raise SchemaInvalidError("Form must be an object")
+    if any(
+        _is_object(property_, definitions) for property_ in
+            schema.get("properties", {}).values()
     ):
         raise SchemaInvalidError("Form must not have nested objects")
     return body
 
 
+def check_memo_schema(type_: PydanticModel) -> None:
+    if not is_frozen(type_):
+        raise SchemaInvalidError(
+            f"Memoized inputs must be frozen, {type_!r} is not")
+
+
+def _is_object(property_: dict, definitions: Dict[str, dict]) -> bool:
+    ref = property_.get("$ref")
+    if ref is not None:
+        property_ = definitions.get(ref.rsplit("/", 1)[-1], {})
+    members = property_.get("anyOf", []) + property_.get("allOf", [])
+    return property_.get("type") == "object" or any(
+        _is_object(member, definitions) for member in members
+    )
+
+
 def check_response_schema(
-    responses: Union[PydanticModel, Dict]
+    responses: Union[PydanticModel, Dict],
+    engine: Optional[ValidationEngine] = None
 ) -> Dict[int, PydanticModel]:
     if not isinstance(responses, dict):
-        if is_builtin_dataclass(responses):
-            responses = pydantic_dataclass(responses).__pydantic_model__
         responses = {200: responses}
 
+    checked = {}
     for status_code, v in responses.items():
         try:
             code = int(status_code)
         except BaseException as e:
             raise ValueError(f"invalid status_code: {status_code}, {str(e)}")
-        if is_builtin_dataclass(v):
-            responses[code] = pydantic_dataclass(v).__pydantic_model__
+        checked[code] = model_registry.model(v, engine)
 
-    return responses
+    return checked
 
 
 def tags(*tags: Iterable[str]) -> Callable:
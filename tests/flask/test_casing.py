@@ -1,6 +1,8 @@
+import json
 from dataclasses import dataclass
+from typing import Any, Dict, List
 
-from flask import Flask
+from flask import Flask, g
 
 from schema_validator import SchemaValidator
 from schema_validator.flask import validate
@@ -22,4 +24,36 @@ def test_response_casing() -> None:
 
     test_client = app.test_client()
     response = test_client.get("/")
-    assert response.json == {"snakeCase": "Hello"}
+    assert json.loads(response.data) == {"snakeCase": "Hello"}
+
+
+@dataclass
+class Item:
+    item_name: str
+
+
+@dataclass
+class Order:
+    order_items: List[Item]
+    free_form: Dict[str, Any]
+
+
+def test_request_casing() -> None:
+    app = Flask(__name__)
+    SchemaValidator(app, convert_casing=True)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Order, responses=Order)
+    def index():
+        return g.body_params
+
+    test_client = app.test_client()
+    data = {
+        "orderItems": [{"itemName": "a"}],
+        "freeForm": {"someKey": {"deepKey": 1}},
+    }
+    response = test_client.post("/", json=data)
+    assert json.loads(response.data) == data
+    response = test_client.post(
+        "/", data="{", content_type="application/json")
+    assert response.status_code == 400
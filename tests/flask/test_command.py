@@ -0,0 +1,151 @@
+import json
+import logging
+import os
+from typing import List
+
+import pytest
+from pydantic import BaseModel, create_model
+from flask import Flask
+
+from schema_validator import SchemaValidator, generate_schema_command
+from schema_validator import core
+from schema_validator.artifact import fingerprint
+from schema_validator.flask import validate
+from schema_validator.registry import model_registry
+
+
+class Details(BaseModel):
+    name: str
+
+
+def _create_app(**kwargs) -> Flask:
+    app = Flask(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app, **kwargs)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Details, tags=["SOME-TAG"])
+    def index():
+        return ""
+
+    return app
+
+
+def test_schema_output(tmp_path) -> None:
+    app = _create_app()
+    output = tmp_path / "openapi.json"
+    result = app.test_cli_runner().invoke(
+        generate_schema_command, ["-o", str(output), "-t", "SOME-TAG"])
+    assert result.exit_code == 0
+    assert "/" in json.loads(output.read_text())["paths"]
+
+
+def test_schema_artifact(tmp_path, monkeypatch) -> None:
+    path = str(tmp_path / "openapi.artifact")
+    result = _create_app().test_cli_runner().invoke(
+        generate_schema_command, ["--artifact", path])
+    assert result.exit_code == 0
+
+    def build_fragment(*args):
+        raise AssertionError("the artifact was not used")
+
+    app = _create_app(artifact_path=path)
+    with monkeypatch.context() as patch:
+        patch.setattr(core, "_build_fragment", build_fragment)
+        response = app.test_client().get("/swagger/openapi-SOME-TAG.json")
+    assert response.status_code == 200
+    assert "/" in json.loads(response.data)["paths"]
+
+    app = _create_app(artifact_path=path)
+    validator = app.extensions["SCHEMA_VALIDATOR"]
+    with monkeypatch.context() as patch:
+        patch.setattr(model_registry, "schema", build_fragment)
+        patch.setattr(core, "_build_fragment", build_fragment)
+        app.test_client().get("/swagger/openapi.json")
+        validator.share_documents(app, path)
+
+    app = _create_app(artifact_path=path, title="Changed")
+    response = app.test_client().get("/swagger/openapi.json")
+    assert json.loads(response.data)["info"]["title"] == "Changed"
+
+
+class Other(BaseModel):
+    count: int
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        b"",
+        b"garbage",
+        b'{"version": 1, "fingerprint": "", "documents": []}\n',
+        b'{"version": 2, "fingerprint": "",'
+        b' "documents": [[null, 0, 10, 10, 10, ""]]}\n{}',
+    ],
+)
+def test_unusable_artifact(tmp_path, caplog, content: bytes) -> None:
+    path = tmp_path / "openapi.artifact"
+    path.write_bytes(content)
+    with caplog.at_level(logging.WARNING):
+        app = _create_app(artifact_path=str(path))
+    assert "ignore openapi artifact" in caplog.text
+    response = app.test_client().get("/swagger/openapi.json")
+    assert "/" in json.loads(response.data)["paths"]
+
+
+def test_fingerprint_nested_models() -> None:
+    # the source of the module of the nested model is what changes
+    def create_validator(module: str) -> SchemaValidator:
+        nested = create_model("Nested", __module__=module, value=(int, ...))
+        outer = create_model("Outer", nested=(List[nested], ...))
+        app = Flask(__name__)
+        validator = SchemaValidator(app)
+
+        @app.route("/")
+        @validate(responses=outer)
+        def index():
+            return ""
+
+        return validator
+
+    validator = create_validator("json")
+    assert fingerprint(validator) == fingerprint(create_validator("json"))
+    assert fingerprint(validator) != fingerprint(create_validator("gzip"))
+
+
+def test_schema_all_tags(tmp_path) -> None:
+    app = _create_app()
+
+    @app.route("/other")
+    @validate(responses=Other, tags=["OTHER-TAG"])
+    def other():
+        return Other(count=1)
+
+    result = app.test_cli_runner().invoke(
+        generate_schema_command,
+        ["-o", str(tmp_path), "--all-tags", "--workers", "2"]
+    )
+    assert result.exit_code == 0
+    some = json.loads((tmp_path / "openapi-SOME-TAG.json").read_text())
+    other_tag = json.loads(
+        (tmp_path / "openapi-OTHER-TAG.json").read_text())
+    assert list(some["paths"]) == ["/"]
+    assert list(other_tag["components"]["schemas"]) == ["Other"]
+
+
+def test_share_documents(tmp_path) -> None:
+    path = str(tmp_path / "openapi.artifact")
+    app = _create_app()
+    app.config["SCHEMA_OPENAPI_ARTIFACT"] = path
+    validator = app.extensions["SCHEMA_VALIDATOR"]
+    validator.share_documents(app)
+
+    document = validator.openapi_document(app, "SOME-TAG")
+    assert isinstance(document.body, memoryview)
+    response = app.test_client().get("/swagger/openapi-SOME-TAG.json")
+    assert response.headers["ETag"] == f'"{document.etag}"'
+    assert bytes(document.body) == response.data
+
+    modified = os.path.getmtime(path)
+    validator.share_documents(app)
+    assert os.path.getmtime(path) == modified
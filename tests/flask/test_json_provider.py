@@ -0,0 +1,75 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+import pytest
+from flask import Flask, jsonify, request
+from pydantic import BaseModel
+
+from schema_validator import SchemaValidator
+from schema_validator.compat import pydantic_encoder
+from schema_validator.json_provider import JSONDefault, orjson
+
+
+class Color(Enum):
+    RED = "red"
+
+
+class Model(BaseModel):
+    snake_case: str
+
+
+@dataclass
+class Data:
+    snake_case: str
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        Model(snake_case="a"), Data(snake_case="a"), Color.RED,
+        datetime(2021, 1, 1), UUID(int=1), Decimal("1.5"), {1, 2},
+    ],
+)
+def test_json_default(value) -> None:
+    default = JSONDefault()
+    assert default(value) == pydantic_encoder(value)
+    assert default(value) == pydantic_encoder(value)
+
+
+def test_json_default_unknown() -> None:
+    with pytest.raises(TypeError):
+        JSONDefault()(object())
+
+
+@pytest.mark.skipif(
+    not hasattr(Flask, "json_provider_class"),
+    reason="json providers need flask >= 2.2"
+)
+@pytest.mark.parametrize("backend", ["json", "orjson"])
+@pytest.mark.parametrize("convert_casing", [True, False])
+def test_json_provider(backend: str, convert_casing: bool) -> None:
+    if backend == "orjson" and orjson is None:
+        pytest.skip("orjson is not installed")
+    app = Flask(__name__)
+    app.config["SCHEMA_JSON_BACKEND"] = backend
+    SchemaValidator(app, convert_casing=convert_casing)
+
+    @app.route("/", methods=["POST"])
+    def index():
+        data = request.get_json()
+        return jsonify(data=data, created=datetime(2021, 1, 1))
+
+    key = "snakeCase" if convert_casing else "snake_case"
+    response = app.test_client().post("/", json={key: 1})
+    assert response.content_type == "application/json"
+    # the response as sent, get_json() decodes it with the provider
+    assert json.loads(response.data) == {
+        "data": {key: 1},
+        "created": "2021-01-01T00:00:00",
+    }
+    assert response.get_json()["data"] == (
+        {"snake_case": 1} if convert_casing else {key: 1})
@@ -0,0 +1,85 @@
+from typing import Optional
+
+import pytest
+from flask import Flask
+
+from schema_validator import DataSource, SchemaValidator
+from schema_validator.flask import validate
+
+msgspec = pytest.importorskip("msgspec")
+
+
+class Details(msgspec.Struct):
+    name: str
+    age: Optional[int] = None
+
+
+class Item(msgspec.Struct):
+    count: int
+    details: Details
+
+
+class QueryItem(msgspec.Struct):
+    count_le: Optional[int] = None
+
+
+def create_app() -> Flask:
+    app = Flask(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(query_string=QueryItem, body=Item, responses=Item)
+    def item():
+        return Item(count=1, details=Details(name="bob", age=2))
+
+    @app.route("/form", methods=["POST"])
+    @validate(body=Details, source=DataSource.FORM, responses=Details)
+    def form():
+        return {"name": "bob"}
+
+    return app
+
+
+@pytest.mark.parametrize(
+    "path, json, status",
+    [
+        ("/", {"count": 2, "details": {"name": "bob"}}, 200),
+        ("/", {"count": "2", "details": {"name": "bob"}}, 400),
+        ("/", {"count": 2}, 400),
+        ("/?count_le=2", {"count": 2, "details": {"name": "bob"}}, 200),
+        ("/?count_le=a", {"count": 2, "details": {"name": "bob"}}, 400),
+    ],
+)
+def test_request_validation(path: str, json: dict, status: int) -> None:
+    test_client = create_app().test_client()
+    response = test_client.post(path, json=json)
+    assert response.status_code == status
+    if status == 200:
+        assert response.get_json() == {
+            "count": 1, "details": {"name": "bob", "age": 2}
+        }
+
+
+def test_form_validation() -> None:
+    test_client = create_app().test_client()
+    response = test_client.post("/form", data={"name": "bob", "age": "2"})
+    assert response.status_code == 200
+    assert response.get_json() == {"name": "bob", "age": None}
+    response = test_client.post("/form", data={"age": "2"})
+    assert response.status_code == 400
+
+
+def test_openapi() -> None:
+    test_client = create_app().test_client()
+    document = test_client.get("/swagger/openapi.json").get_json()
+    schemas = document["components"]["schemas"]
+    assert set(schemas) == {"Item", "Details"}
+    assert schemas["Item"]["properties"]["details"] == {
+        "$ref": "#/components/schemas/Details"
+    }
+    operation = document["paths"]["/"]["post"]
+    assert operation["parameters"][0]["name"] == "count_le"
+    assert operation["requestBody"]["content"]["application/json"] == {
+        "schema": {"$ref": "#/components/schemas/Item"}
+    }
@@ -0,0 +1,263 @@
+import gzip
+import json
+
+from pydantic import BaseModel, create_model
+from flask import Blueprint, Flask
+
+from schema_validator import DataSource, SchemaValidator
+from schema_validator.flask import validate
+
+
+class Details(BaseModel):
+    name: str
+
+
+def _create_app() -> Flask:
+    app = Flask(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Details, tags=["SOME-TAG"])
+    def index():
+        return ""
+
+    return app
+
+
+def test_openapi_etag() -> None:
+    app = _create_app()
+    test_client = app.test_client()
+
+    response = test_client.get("/swagger/openapi.json")
+    assert response.status_code == 200
+    assert response.headers["Cache-Control"] == "no-cache"
+    etag = response.headers["ETag"]
+    assert "/" in json.loads(response.data)["paths"]
+
+    response = test_client.get(
+        "/swagger/openapi.json", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.data == b""
+
+
+def test_openapi_gzip() -> None:
+    app = _create_app()
+    test_client = app.test_client()
+
+    response = test_client.get(
+        "/swagger/openapi-SOME-TAG.json",
+        headers={"Accept-Encoding": "gzip"}
+    )
+    assert response.headers["Content-Encoding"] == "gzip"
+    schema = json.loads(gzip.decompress(response.data))
+    assert schema["paths"]["/"]["post"]["tags"] == ["SOME-TAG"]
+
+
+def test_openapi_gzip_refused() -> None:
+    app = _create_app()
+    test_client = app.test_client()
+
+    response = test_client.get(
+        "/swagger/openapi.json",
+        headers={"Accept-Encoding": "gzip;q=0, identity"}
+    )
+    assert "Content-Encoding" not in response.headers
+    assert "/" in json.loads(response.data)["paths"]
+
+
+def test_openapi_unknown_tag() -> None:
+    app = _create_app()
+    validator = app.extensions["SCHEMA_VALIDATOR"]
+    test_client = app.test_client()
+    test_client.get("/swagger/openapi-SOME-TAG.json")
+
+    for tag in ("OTHER-TAG", "x" * 100):
+        response = test_client.get(f"/swagger/openapi-{tag}.json")
+        assert response.status_code == 404
+    assert list(validator._documents) == ["SOME-TAG"]
+
+    app.config["SCHEMA_OPENAPI_STREAM"] = True
+    response = test_client.get("/swagger/openapi-OTHER-TAG.json")
+    assert response.status_code == 404
+
+
+def test_openapi_invalidation() -> None:
+    app = _create_app()
+    validator = app.extensions["SCHEMA_VALIDATOR"]
+    # built outside of a request, flask >= 2.3 takes no routes after one
+    etag = validator.openapi_document(app).etag
+
+    @app.route("/late")
+    def late():
+        return ""
+
+    response = app.test_client().get(
+        "/swagger/openapi.json", headers={"If-None-Match": f'"{etag}"'})
+    assert response.status_code == 200
+    assert "/late" in json.loads(response.data)["paths"]
+
+
+def test_endpoint_registry() -> None:
+    app = Flask(__name__)
+
+    @app.route("/early")
+    @validate(responses=Details, tags=["EARLY"])
+    def early():
+        return ""
+
+    SchemaValidator(app)
+    blueprint = Blueprint("bp", __name__)
+
+    @blueprint.route("/late", methods=["PUT"])
+    @validate(body=Details, tags=["LATE"])
+    def late():
+        return ""
+
+    app.register_blueprint(blueprint)
+
+    endpoints = app.extensions["SCHEMA_VALIDATOR"].endpoints
+    assert endpoints.get("early", "GET").responses == {200: Details}
+    assert endpoints.get("bp.late", "put").request == (Details, DataSource.JSON)
+    assert [entry.endpoint for entry in endpoints.for_tag("LATE")] == \
+        ["bp.late"]
+    assert endpoints.get("early", "POST") is None
+
+
+class Item(BaseModel):
+    count: int
+    details: Details
+
+
+def test_openapi_split_components() -> None:
+    app = Flask(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app, split_components=True)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Item)
+    def index():
+        return ""
+
+    test_client = app.test_client()
+    schema = json.loads(test_client.get("/swagger/openapi.json").data)
+    body = schema["paths"]["/"]["post"]["requestBody"]
+    assert body["content"]["application/json"]["schema"] == \
+        {"$ref": "schemas/Item.json"}
+    assert schema["components"]["schemas"] == {}
+
+    item = json.loads(test_client.get("/swagger/schemas/Item.json").data)
+    assert item["properties"]["details"] == {"$ref": "Details.json"}
+    response = test_client.get("/swagger/schemas/Details.json")
+    assert response.status_code == 200
+    response = test_client.get("/swagger/schemas/Missing.json")
+    assert response.status_code == 404
+
+
+def test_openapi_tag_components() -> None:
+    app = _create_app()
+
+    @app.route("/item", methods=["POST"])
+    @validate(body=Item, tags=["OTHER-TAG"])
+    def item():
+        return ""
+
+    test_client = app.test_client()
+    schema = json.loads(
+        test_client.get("/swagger/openapi-SOME-TAG.json").data)
+    assert list(schema["components"]["schemas"]) == ["Details"]
+
+
+def test_openapi_stream() -> None:
+    app = _create_app()
+    app.config["SCHEMA_OPENAPI_STREAM"] = True
+    test_client = app.test_client()
+
+    response = test_client.get("/swagger/openapi.json")
+    assert response.is_streamed
+    assert json.loads(response.data)["paths"]["/"]["post"]["requestBody"]
+
+
+def test_swagger_ui_page() -> None:
+    app = _create_app()
+    test_client = app.test_client()
+
+    response = test_client.get("/swagger/docs/SOME-TAG")
+    assert response.mimetype == "text/html"
+    assert b"/swagger/openapi-SOME-TAG.json" in response.data
+
+    response = test_client.get(
+        "/swagger/docs/SOME-TAG",
+        headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+def test_swagger_ui_unknown_tag() -> None:
+    app = _create_app()
+    validator = app.extensions["SCHEMA_VALIDATOR"]
+    test_client = app.test_client()
+    test_client.get("/swagger/docs/SOME-TAG")
+
+    for tag in ("OTHER-TAG", "x" * 100):
+        response = test_client.get(f"/swagger/docs/{tag}")
+        assert response.status_code == 404
+    assert [key[0] for key in validator._pages] == ["SOME-TAG"]
+
+
+def test_swagger_local_assets() -> None:
+    app = Flask(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    app.config["SCHEMA_SWAGGER_LOCAL_ASSETS"] = True
+    validator = SchemaValidator(app)
+    test_client = app.test_client()
+
+    js_url = validator.swagger_assets.urls["SCHEMA_SWAGGER_JS_URL"]
+    assert js_url.startswith("/swagger/static/swagger-ui-bundle.")
+    page = test_client.get("/swagger/docs").data
+    assert js_url.encode() in page
+    assert b"cdnjs" not in page
+
+    response = test_client.get(js_url, headers={"Accept-Encoding": "gzip"})
+    assert response.status_code == 200
+    assert response.mimetype == "text/javascript"
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert test_client.get("/swagger/static/missing.js").status_code == 404
+
+
+def test_openapi_nested_name_clash() -> None:
+    details_a = create_model("Details", __module__="moda", a=(str, ...))
+    details_b = create_model("Details", __module__="modb", b=(str, ...))
+    wrapper = create_model("Wrapper", __module__="modb", details=(
+        details_b, ...))
+
+    app = Flask(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app)
+
+    @app.route("/a")
+    @validate(responses=details_a)
+    def a():
+        return {"a": ""}
+
+    @app.route("/b")
+    @validate(responses=wrapper)
+    def b():
+        return {"details": {"b": ""}}
+
+    document = json.loads(app.test_client().get("/swagger/openapi.json").data)
+    schemas = document["components"]["schemas"]
+
+    def resolve(schema: dict) -> dict:
+        if "allOf" in schema:
+            schema = schema["allOf"][0]
+        return schemas[schema["$ref"].rsplit("/", 1)[-1]]
+
+    def response(path: str) -> dict:
+        return resolve(document["paths"][path]["get"]["responses"]["200"][
+            "content"]["application/json"]["schema"])
+
+    assert list(response("/a")["properties"]) == ["a"]
+    nested = resolve(response("/b")["properties"]["details"])
+    assert list(nested["properties"]) == ["b"]
@@ -68,3 +68,50 @@ def test_generate_swagger():
 
     assert schema["paths"]["/test"]["post"]["requestBody"]
     assert schema["paths"]["/test"]["post"]["responses"]
+
+
+def test_generate_swagger_reuses_fragments():
+    app = Flask(__name__)
+    SchemaValidator(app)
+
+    @app.route("/test", methods=["POST"])
+    @validate(body=Details)
+    def index():
+        return g.body_params.dict()
+
+    extension = app.extensions["SCHEMA_VALIDATOR"]
+    first = _build_openapi_schema(app, extension)
+
+    @app.route("/other")
+    @validate(responses=DCDetails)
+    def other():
+        return DCDetails(name="bob")
+
+    second = _build_openapi_schema(app, extension)
+    assert second["paths"]["/test"]["post"] is \
+        first["paths"]["/test"]["post"]
+    assert second["paths"]["/other"]["get"]["responses"]
+
+
+def test_generate_swagger_refs_components():
+    app = Flask(__name__)
+    SchemaValidator(app)
+
+    @app.route("/a")
+    @validate(responses=Details)
+    def a():
+        return Details(name="bob")
+
+    @app.route("/b", methods=["POST"])
+    @validate(body=Details, responses=Details)
+    def b():
+        return Details(name="bob")
+
+    schema = _build_openapi_schema(app, app.extensions["SCHEMA_VALIDATOR"])
+
+    ref = {"$ref": "#/components/schemas/Details"}
+    post = schema["paths"]["/b"]["post"]
+    assert post["requestBody"]["content"]["application/json"]["schema"] == ref
+    assert post["responses"][200]["content"]["application/json"]["schema"] \
+        == ref
+    assert schema["components"]["schemas"]["Details"]["properties"]["name"]
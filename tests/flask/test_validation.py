@@ -1,13 +1,19 @@
+import gzip
 from dataclasses import dataclass
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional
 
 import pytest
 from pydantic import BaseModel
 from pydantic.dataclasses import dataclass as pydantic_dataclass
-from flask import Flask, jsonify
+from flask import Flask, g, jsonify, request
+from typing_extensions import TypedDict
 
-from schema_validator import DataSource, SchemaValidator
+from schema_validator import CompiledPydanticEngine, DataSource, \
+    InputMemo, PydanticEngine, ResponseCache, SchemaValidator, \
+    ValidationEngine
+from schema_validator.cache import RedisResponseBackend
 from schema_validator.flask import validate
+from schema_validator.utils import SchemaInvalidError
 
 
 @dataclass
@@ -50,6 +56,11 @@ class PyDCItem:
     details: PyDCDetails
 
 
+class TDDetails(TypedDict):
+    name: str
+    age: Optional[int]
+
+
 VALID_DICT = {"count": 2, "details": {"name": "bob"}}
 INVALID_DICT = {"count": 2, "name": "bob"}
 VALID = Item(count=2, details=Details(name="bob"))
@@ -60,7 +71,7 @@ VALID_PyDC = PyDCItem(count=2, details=PyDCDetails(name="bob"))
 INVALID_PyDC = PyDCDetails(name="bob")
 
 
-@pytest.mark.parametrize("path", ["/", "/dc"])
+@pytest.mark.parametrize("path", ["/", "/dc", "/pydc"])
 @pytest.mark.parametrize(
     "json, status",
     [
@@ -82,6 +93,11 @@ def test_request_validation(path: str, json: dict, status: int) -> None:
     def dc_item():
         return ""
 
+    @app.route("/pydc", methods=["POST"])
+    @validate(body=PyDCItem)
+    def pydc_item():
+        return ""
+
     test_client = app.test_client()
     response = test_client.post(path, json=json)
     assert response.status_code == status
@@ -164,3 +180,329 @@ def test_querystring_validation(path: str, status: int) -> None:
     test_client = app.test_client()
     response = test_client.get(path)
     assert response.status_code == status
+
+
+class RecordingEngine(PydanticEngine):
+    def __init__(self) -> None:
+        self.calls = []
+
+    def validate_mapping(self, type_: Any, data: Any) -> Any:
+        self.calls.append(type_)
+        return super().validate_mapping(type_, data)
+
+    def validate_bytes(self, type_: Any, data: bytes) -> Any:
+        self.calls.append(type_)
+        return super().validate_bytes(type_, data)
+
+
+@pytest.mark.parametrize("per_endpoint", [True, False])
+def test_engine(per_endpoint: bool) -> None:
+    engine = RecordingEngine()
+    app = Flask(__name__)
+    SchemaValidator(app, engine=None if per_endpoint else engine)
+
+    @app.route("/", methods=["POST"])
+    @validate(
+        query_string=QueryItem,
+        responses=Details,
+        engine=engine if per_endpoint else None
+    )
+    def item():
+        return {"name": "bob"}
+
+    test_client = app.test_client()
+    response = test_client.post("/?count_le=2")
+    assert response.status_code == 200
+    assert [type_.__name__ for type_ in engine.calls] == [
+        "QueryItem", "Details"
+    ]
+
+
+@pytest.mark.parametrize(
+    "model, json, expected",
+    [
+        (TDDetails, {"name": "bob", "age": "2"}, {"name": "bob", "age": 2}),
+        (TDDetails, {"age": 2}, None),
+        (List[TDDetails], [{"name": "bob", "age": None}], ...),
+        (List[TDDetails], {"name": "bob", "age": None}, None),
+        (Dict[str, int], {"a": "1"}, {"a": 1}),
+        (Dict[str, int], {"a": "b"}, None),
+    ],
+)
+def test_container_validation(model: Any, json: Any, expected: Any) -> None:
+    app = Flask(__name__)
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=model, responses=model)
+    def item():
+        assert not isinstance(g.body_params, BaseModel)
+        return jsonify(g.body_params)
+
+    test_client = app.test_client()
+    response = test_client.post("/", json=json)
+    if expected is None:
+        assert response.status_code == 400
+    else:
+        assert response.status_code == 200
+        assert response.get_json() == (json if expected is ... else expected)
+
+
+@pytest.mark.parametrize("return_value", [VALID, VALID_DICT, INVALID_DICT])
+def test_compiled_engine(return_value: Any) -> None:
+    app = Flask(__name__)
+    SchemaValidator(app, engine=CompiledPydanticEngine())
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Item, responses=Item)
+    def item():
+        assert g.body_params == Item(**VALID_DICT)
+        return return_value
+
+    test_client = app.test_client()
+    response = test_client.post("/", json=VALID_DICT)
+    if return_value is INVALID_DICT:
+        assert response.status_code == 400
+    else:
+        assert response.get_json() == {
+            "count": 2, "details": {"name": "bob", "age": None}
+        }
+
+
+@pytest.mark.parametrize("engine", [None, CompiledPydanticEngine()])
+def test_response_status_and_headers(engine) -> None:
+    app = Flask(__name__)
+    SchemaValidator(app, engine=engine)
+
+    @app.route("/")
+    @validate(responses={201: Item})
+    def item():
+        return VALID, 201, {"X-Count": "2"}
+
+    test_client = app.test_client()
+    response = test_client.get("/")
+    assert response.status_code == 201
+    assert response.headers["X-Count"] == "2"
+    assert response.content_type == "application/json"
+    assert response.get_json() == {
+        "count": 2, "details": {"name": "bob", "age": None}
+    }
+
+
+@dataclass(frozen=True)
+class FrozenQuery:
+    count_le: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class FrozenBody:
+    name: str
+
+
+def test_memo() -> None:
+    app = Flask(__name__)
+    engine = RecordingEngine()
+    memo = InputMemo(maxsize=8)
+    SchemaValidator(app, engine=engine)
+
+    @app.route("/", methods=["POST"])
+    @validate(query_string=FrozenQuery, body=FrozenBody, memo=memo)
+    def index():
+        return jsonify(
+            name=g.body_params.name, count_le=g.query_params.count_le)
+
+    test_client = app.test_client()
+    for _ in range(3):
+        response = test_client.post("/?count_le=2", json={"name": "bob"})
+        assert response.json == {"name": "bob", "count_le": 2}
+    response = test_client.post("/?count_le=a", json={"name": "bob"})
+    assert response.status_code == 400
+    assert test_client.post("/?count_le=a", json={}).status_code == 400
+    assert len(engine.calls) == 5
+    assert (memo.hits, memo.misses) == (5, 5)
+    assert memo.info().currsize == 2
+
+
+def test_memo_needs_frozen_models() -> None:
+    with pytest.raises(SchemaInvalidError):
+        validate(query_string=QueryItem, memo=InputMemo())
+
+
+class FakeRedis:
+    def __init__(self) -> None:
+        self.data = {}
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.data.get(key)
+
+    def set(self, key: str, value: bytes, px: Optional[int] = None) -> None:
+        assert isinstance(value, bytes) and px == 60000
+        self.data[key] = value
+
+
+@pytest.mark.parametrize("redis", [False, True])
+def test_response_cache(redis: bool) -> None:
+    app = Flask(__name__)
+    backend = RedisResponseBackend(FakeRedis()) if redis else None
+    cache = ResponseCache(backend=backend)
+    SchemaValidator(app)
+    calls = []
+
+    @app.route("/<int:id>")
+    @validate(query_string=QueryItem, responses=Details, cache=cache)
+    def index(id: int):
+        calls.append(id)
+        return {"name": "bob" * 100, "age": id}
+
+    test_client = app.test_client()
+    first = test_client.get("/1?count_le=2")
+    assert first.json == {"name": "bob" * 100, "age": 1}
+    second = test_client.get(
+        "/1?count_le=02&other=1", headers={"Accept-Encoding": "gzip"})
+    assert second.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(second.data) == first.data
+    assert second.content_type == first.content_type
+    refused = test_client.get(
+        "/1?count_le=2", headers={"Accept-Encoding": "gzip;q=0"})
+    assert "Content-Encoding" not in refused.headers
+    assert refused.data == first.data
+    assert test_client.get("/2?count_le=2").json["age"] == 2
+    response = test_client.get(
+        "/1?count_le=2", headers={"If-None-Match": first.headers["ETag"]})
+    assert response.status_code == 304
+    assert test_client.get("/1?count_le=a").status_code == 400
+    assert calls == [1, 2]
+    assert (cache.hits, cache.misses) == (3, 2)
+
+
+def test_response_cache_private() -> None:
+    app = Flask(__name__)
+    cache = ResponseCache()
+    SchemaValidator(app)
+
+    @app.route("/raw")
+    @validate(cache=cache)
+    def raw():
+        return {"page": request.args["page"]}
+
+    @app.route("/me")
+    @validate(cache=cache)
+    def me():
+        return {"name": request.headers.get("Authorization")}
+
+    @app.route("/language")
+    @validate(cache=cache)
+    def language():
+        response = jsonify(language=request.headers.get("Accept-Language"))
+        response.vary.add("Accept-Language")
+        return response
+
+    test_client = app.test_client()
+    assert test_client.get("/raw?page=1").json == {"page": "1"}
+    assert test_client.get("/raw?page=2").json == {"page": "2"}
+    for name in ("alice", "bob"):
+        response = test_client.get("/me", headers={"Authorization": name})
+        assert response.json == {"name": name}
+    for accept in ("en", "fr"):
+        response = test_client.get(
+            "/language", headers={"Accept-Language": accept})
+        assert response.json == {"language": accept}
+    assert cache.hits == 0
+
+
+@pytest.mark.parametrize(
+    "cache_control", ["private", "no-store", "no-cache", "private, no-store"])
+def test_response_cache_control(cache_control: str) -> None:
+    app = Flask(__name__)
+    cache = ResponseCache()
+    SchemaValidator(app)
+    calls = []
+
+    @app.route("/")
+    @validate(cache=cache)
+    def index():
+        calls.append(1)
+        response = jsonify(count=len(calls))
+        response.headers["Cache-Control"] = cache_control
+        return response
+
+    test_client = app.test_client()
+    for count in (1, 2):
+        assert test_client.get("/").json == {"count": count}
+    assert cache.hits == 0
+
+
+def test_request_not_json() -> None:
+    app = Flask(__name__)
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Item)
+    def item():
+        return ""
+
+    test_client = app.test_client()
+    response = test_client.post(
+        "/", data='{"count": 2, "details": {"name": "bob"}}',
+        content_type="text/plain"
+    )
+    assert response.status_code in (400, 415)
+
+
+class Point:
+    def __init__(self, x: int, y: int) -> None:
+        self.x = x
+        self.y = y
+
+
+class PointEngine(ValidationEngine):
+    def supports(self, type_: Any) -> bool:
+        return type_ is Point
+
+    def validate_mapping(self, type_: Any, data: Any) -> Any:
+        try:
+            return Point(int(data["x"]), int(data["y"]))
+        except KeyError as e:
+            raise ValueError(f"missing {e}")
+
+    def to_builtins(self, type_: Any, value: Any) -> Any:
+        return {"x": value.x, "y": value.y}
+
+    def json_schema(self, type_: Any, ref_prefix: str) -> dict:
+        return {
+            "title": "Point",
+            "type": "object",
+            "properties": {
+                "x": {"type": "integer"}, "y": {"type": "integer"},
+            },
+        }
+
+
+def test_incomplete_engine() -> None:
+    class PartialEngine(ValidationEngine):
+        def supports(self, type_: Any) -> bool:
+            return type_ is Point
+
+    with pytest.raises(TypeError):
+        PartialEngine()
+
+
+def test_foreign_type_engine() -> None:
+    app = Flask(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    engine = PointEngine()
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Point, responses=Point, engine=engine)
+    def index():
+        return Point(g.body_params.y, g.body_params.x)
+
+    test_client = app.test_client()
+    response = test_client.post("/", json={"x": 1, "y": "2"})
+    assert response.json == {"x": 2, "y": 1}
+    assert test_client.post("/", json={"x": 1}).status_code == 400
+    document = test_client.get("/swagger/openapi.json").json
+    assert document["components"]["schemas"]["Point"]["properties"] == {
+        "x": {"type": "integer"}, "y": {"type": "integer"},
+    }
@@ -1,7 +1,10 @@
+import json
 from dataclasses import dataclass
+from typing import Any, Dict, List
 
 import pytest
-from quart import Quart
+from pydantic import BaseModel
+from quart import Quart, g
 
 from schema_validator import SchemaValidator
 from schema_validator.quart import validate
@@ -24,5 +27,47 @@ async def test_response_casing() -> None:
 
     test_client = app.test_client()
     response = await test_client.get("/")
-    result = await response.get_json()
+    result = json.loads(await response.get_data())
     assert result == {"snakeCase": "Hello"}
+
+
+
+@dataclass
+class Item:
+    item_name: str
+
+
+class Named(BaseModel):
+    item_name: str
+
+
+@dataclass
+class Order:
+    order_items: List[Item]
+    free_form: Dict[str, Any]
+
+
+@pytest.mark.asyncio
+async def test_request_casing() -> None:
+    app = Quart(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app, convert_casing=True)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Order, responses=Order)
+    async def index():
+        return g.body_params
+
+    @app.route("/model", methods=["GET"])
+    async def model():
+        return Named(item_name="a")
+
+    test_client = app.test_client()
+    data = {
+        "orderItems": [{"itemName": "a"}],
+        "freeForm": {"someKey": {"deepKey": 1}},
+    }
+    response = await test_client.post("/", json=data)
+    assert json.loads(await response.get_data()) == data
+    response = await test_client.get("/model")
+    assert json.loads(await response.get_data()) == {"itemName": "a"}
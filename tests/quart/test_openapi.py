@@ -0,0 +1,139 @@
+import asyncio
+import json
+import threading
+
+import pytest
+from pydantic import BaseModel
+from quart import Quart
+
+from schema_validator import SchemaValidator, core
+from schema_validator.quart import validate
+from schema_validator.cache import CachedDocument
+from schema_validator.quart.api import STREAM_CHUNK_SIZE, \
+    _stream_in_executor, cached_response
+
+
+class Details(BaseModel):
+    name: str
+
+
+@pytest.mark.asyncio
+async def test_openapi_etag() -> None:
+    app = Quart(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Details)
+    async def index():
+        return ""
+
+    test_client = app.test_client()
+    response = await test_client.get("/swagger/openapi.json")
+    assert response.status_code == 200
+    assert "/" in json.loads(await response.get_data())["paths"]
+
+    response = await test_client.get(
+        "/swagger/openapi.json",
+        headers={"If-None-Match": response.headers["ETag"]}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_openapi_stream() -> None:
+    app = Quart(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    app.config["SCHEMA_OPENAPI_STREAM"] = True
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Details)
+    async def index():
+        return ""
+
+    test_client = app.test_client()
+    response = await test_client.get("/swagger/openapi.json")
+    schema = json.loads(await response.get_data())
+    assert schema["components"]["schemas"]["Details"]
+
+
+@pytest.mark.asyncio
+async def test_stream_in_executor() -> None:
+    threads = set()
+
+    def generate():
+        for _ in range(1034):
+            threads.add(threading.get_ident())
+            yield b"x" * 64
+
+    chunks = [chunk async for chunk in _stream_in_executor(generate())]
+    assert b"".join(chunks) == b"x" * 64 * 1034
+    # joined, not one executor call per chunk of the generator
+    assert [len(chunk) for chunk in chunks] == [STREAM_CHUNK_SIZE, 640]
+    assert threads and threading.get_ident() not in threads
+
+
+@pytest.mark.asyncio
+async def test_swagger_ui_page() -> None:
+    app = Quart(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app, title="Quart <docs>")
+
+    test_client = app.test_client()
+    response = await test_client.get("/swagger/docs")
+    page = await response.get_data()
+    assert b"/swagger/openapi.json" in page
+    assert b"Quart &lt;docs&gt;" in page
+
+
+@pytest.mark.asyncio
+async def test_openapi_built_in_executor(monkeypatch) -> None:
+    app = Quart(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    validator = SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=Details)
+    async def index():
+        return ""
+
+    threads = []
+    build = core._build_openapi_schema
+
+    def build_openapi_schema(*args):
+        threads.append(threading.get_ident())
+        return build(*args)
+
+    monkeypatch.setattr(core, "_build_openapi_schema", build_openapi_schema)
+    documents = await asyncio.gather(*(
+        validator.openapi_document_async(app) for _ in range(3)
+    ))
+    assert documents[0] is documents[1] is documents[2]
+    assert len(threads) == 1
+    assert threads[0] != threading.get_ident()
+
+
+@pytest.mark.asyncio
+async def test_openapi_warm_up() -> None:
+    app = Quart(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    validator = SchemaValidator(app)
+
+    async with app.test_app():
+        await validator._warm_up_task
+        assert None in validator._documents
+
+
+@pytest.mark.asyncio
+async def test_shared_document_not_copied() -> None:
+    app = Quart(__name__)
+    SchemaValidator(app)
+    body = memoryview(b'{"openapi":"3.0.3"}')
+    document = CachedDocument(body)
+
+    async with app.test_request_context("/"):
+        response = cached_response(document, "application/json")
+        assert response.content_length == len(body)
+        chunks = [chunk async for chunk in response.response]
+    assert len(chunks) == 1 and chunks[0] is body
@@ -5,7 +5,8 @@ import pytest
 from pydantic import BaseModel
 from quart import Quart, g
 
-from schema_validator import DataSource, SchemaValidator
+from schema_validator import CompiledPydanticEngine, DataSource, \
+    SchemaValidator
 from schema_validator.quart import validate
 from schema_validator.core import _build_openapi_schema
 from schema_validator.types import PydanticModel
@@ -73,3 +74,22 @@ async def test_generate_swagger():
 
     assert schema["paths"]["/test"]["post"]["requestBody"]
     assert schema["paths"]["/test"]["post"]["responses"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("engine", [None, CompiledPydanticEngine()])
+async def test_model_response(engine) -> None:
+    app = Quart(__name__)
+    app.config["SWAGGER_ROUTE"] = True
+    SchemaValidator(app, engine=engine)
+
+    @app.route("/")
+    async def index():
+        return Details(name="bob", age=2), 201, {"X-Name": "bob"}
+
+    test_client = app.test_client()
+    response = await test_client.get("/")
+    assert response.status_code == 201
+    assert response.headers["X-Name"] == "bob"
+    assert response.content_type == "application/json"
+    assert await response.get_json() == {"name": "bob", "age": 2}
@@ -4,9 +4,10 @@ from typing import Any, Optional
 import pytest
 from pydantic import BaseModel
 from pydantic.dataclasses import dataclass as pydantic_dataclass
-from quart import Quart, jsonify
+from quart import Quart, g, jsonify
 
-from schema_validator import DataSource, SchemaValidator
+from schema_validator import DataSource, InputMemo, ResponseCache, \
+    SchemaValidator
 from schema_validator.quart import validate
 
 
@@ -61,7 +62,7 @@ INVALID_PyDC = PyDCDetails(name="bob")
 
 
 @pytest.mark.asyncio
-@pytest.mark.parametrize("path", ["/", "/dc"])
+@pytest.mark.parametrize("path", ["/", "/dc", "/pydc"])
 @pytest.mark.parametrize(
     "json, status",
     [
@@ -83,6 +84,11 @@ async def test_request_validation(path: str, json: dict, status: int) -> None:
     async def dc_item():
         return ""
 
+    @app.route("/pydc", methods=["POST"])
+    @validate(body=PyDCItem)
+    async def pydc_item():
+        return ""
+
     test_client = app.test_client()
     response = await test_client.post(path, json=json)
     assert response.status_code == status
@@ -168,3 +174,70 @@ async def test_querystring_validation(path: str, status: int) -> None:
     test_client = app.test_client()
     response = await test_client.get(path)
     assert response.status_code == status
+
+
+@dataclass(frozen=True)
+class FrozenBody:
+    name: str
+
+
+@pytest.mark.asyncio
+async def test_memo() -> None:
+    app = Quart(__name__)
+    memo = InputMemo()
+    SchemaValidator(app)
+
+    @app.route("/", methods=["POST"])
+    @validate(body=FrozenBody, memo=memo)
+    async def index():
+        return jsonify(id=id(g.body_params))
+
+    test_client = app.test_client()
+    ids = set()
+    for _ in range(3):
+        response = await test_client.post("/", json={"name": "bob"})
+        ids.add((await response.get_json())["id"])
+    assert len(ids) == 1
+    assert (memo.hits, memo.misses) == (2, 1)
+
+
+@pytest.mark.asyncio
+async def test_response_cache() -> None:
+    app = Quart(__name__)
+    cache = ResponseCache()
+    SchemaValidator(app)
+    calls = []
+
+    @app.route("/")
+    @validate(query_string=QueryItem, responses=Details, cache=cache)
+    async def index():
+        calls.append(1)
+        return {"name": "bob", "age": g.query_params.count_le}
+
+    test_client = app.test_client()
+    for path in ("/?count_le=2", "/?count_le=02"):
+        response = await test_client.get(path)
+        assert await response.get_json() == {"name": "bob", "age": 2}
+    assert calls == [1]
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("cache_control", ["private", "no-store", "no-cache"])
+async def test_response_cache_control(cache_control: str) -> None:
+    app = Quart(__name__)
+    cache = ResponseCache()
+    SchemaValidator(app)
+    calls = []
+
+    @app.route("/")
+    @validate(cache=cache)
+    async def index():
+        calls.append(1)
+        return {"count": len(calls)}, {"Cache-Control": cache_control}
+
+    test_client = app.test_client()
+    for count in (1, 2):
+        response = await test_client.get("/")
+        assert await response.get_json() == {"count": count}
+    assert cache.hits == 0
@@ -0,0 +1,54 @@
+from schema_validator.cache import CachedDocument, CachedResponse, \
+    InputMemo, LRUCache, MemoryResponseBackend
+
+
+def test_lru_cache() -> None:
+    cache = LRUCache(2)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c"), len(cache)) == (1, 3, 2)
+    assert cache.info().hit_ratio == 3 / 4
+
+
+def test_lru_cache_ttl() -> None:
+    now = [0.0]
+    cache = LRUCache(2, ttl=10, timer=lambda: now[0])
+    cache.set("a", 1)
+    now[0] = 9.9
+    assert cache.get("a") == 1
+    now[0] = 10
+    assert cache.get("a") is None
+    assert len(cache) == 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_input_memo_key() -> None:
+    assert InputMemo.key(int, b"a=1") == InputMemo.key(int, b"a=1")
+    assert InputMemo.key(int, b"a=1") != InputMemo.key(int, b"a=2")
+    assert InputMemo.key(int, b"a=1") != InputMemo.key(str, b"a=1")
+
+
+def test_memory_response_backend_ttl() -> None:
+    now = [0.0]
+    backend = MemoryResponseBackend(timer=lambda: now[0])
+    response = CachedResponse(200, [], CachedDocument(b"{}"))
+    backend.set("a", response, 10)
+    backend.set("b", response, None)
+    now[0] = 10
+    assert backend.get("a") is None
+    assert backend.get("b") is response
+
+
+def test_cached_response_bytes() -> None:
+    response = CachedResponse(
+        201, [("Content-Type", "application/json"), ("X-Name", "\n")],
+        CachedDocument(b'{"a":\n1}')
+    )
+    copy = CachedResponse.from_bytes(response.to_bytes())
+    assert (copy.status, copy.headers) == (response.status, response.headers)
+    assert copy.document.body == response.document.body
+    assert copy.document.gzip_body == response.document.gzip_body
+    assert copy.document.etag == response.document.etag
@@ -0,0 +1,106 @@
+import json
+from typing import Any, Dict, List, Optional
+
+import pytest
+from humps import camelize, decamelize
+from pydantic import BaseModel
+
+from schema_validator.casing import CasingTables
+from schema_validator.json_provider import CasingJSONDecoder, KeyConverter
+
+
+class Child(BaseModel):
+    child_name: str
+    extra_data: Dict[str, Any] = {}
+
+
+class Node(BaseModel):
+    node_id: int
+    next_node: Optional["Node"] = None
+
+
+Node.update_forward_refs()
+
+
+class Parent(BaseModel):
+    parent_id: int
+    first_child: Child
+    other_children: List[Child] = []
+    maybe_child: Optional[Child] = None
+    free_form: Any = None
+    head_node: Optional[Node] = None
+
+
+VALUE = {
+    "parent_id": 1,
+    "first_child": {"child_name": "a", "extra_data": {"some_key": [
+        {"nested_key": 1}]}},
+    "other_children": [{"child_name": "b", "extra_data": {}}],
+    "maybe_child": None,
+    "free_form": {"free_key": {"deep_key": 1}},
+    "head_node": {"node_id": 1, "next_node": {"node_id": 2}},
+    "undeclared_key": [{"some_key": 1}],
+}
+
+
+def test_camelize_as_humps() -> None:
+    tables = CasingTables()
+    assert tables.camelize(Parent, VALUE) == camelize(VALUE)
+    assert tables.camelize(Parent, [VALUE]) == camelize([VALUE])
+
+
+def test_decamelize_as_humps() -> None:
+    tables = CasingTables()
+    assert tables.decamelize(Parent, camelize(VALUE)) == VALUE
+
+
+def test_table() -> None:
+    tables = CasingTables()
+    table = tables.table(Parent, camel=True)
+    assert table is tables.table(Parent, camel=True)
+    assert table.keys["first_child"][0] == "firstChild"
+    assert table.keys["other_children"][1].items is table.keys[
+        "first_child"][1]
+    assert table.keys["free_form"][1] is None
+    node = table.keys["head_node"][1]
+    assert node.keys["next_node"][1] is node
+    assert tables.table(Parent, camel=False).keys["firstChild"][0] == \
+        "first_child"
+
+
+def test_not_a_dict() -> None:
+    tables = CasingTables()
+    assert tables.camelize(Parent, "snake_case") == "snake_case"
+    assert tables.decamelize(Child, 1) == decamelize(1)
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        VALUE, [VALUE, 1, "some_str", None],
+        {1: {"int_key": 1}, "ABC_def": (1, {"tuple_item": 1})},
+    ],
+)
+def test_key_converter_as_humps(value: Any) -> None:
+    assert KeyConverter(camelize)(value) == camelize(value)
+    assert KeyConverter(decamelize)(camelize(value)) == decamelize(
+        camelize(value))
+    # the values which are not json containers are left as they are
+    assert KeyConverter(camelize)("some_str") == "some_str"
+
+
+def test_key_converter_cache() -> None:
+    converter = KeyConverter(camelize, maxsize=2)
+    converter([{"first_key": 1, "second_key": 2}] * 3)
+    info = converter.cache.info()
+    assert (info.hits, info.misses, info.currsize) == (4, 2, 2)
+    assert info.hit_ratio == 4 / 6
+    converter({"third_key": 1})
+    assert "first_key" not in converter.cache
+
+
+def test_decoder() -> None:
+    data = '{"someKey": [{"nestedKey": {"deepKey": 1}}]}'
+    assert json.loads(data, cls=CasingJSONDecoder) == decamelize(
+        json.loads(data))
+
@@ -0,0 +1,194 @@
+import itertools
+import json
+from datetime import date, datetime, timezone
+from enum import Enum
+from typing import Any, Dict, List, Optional
+
+import pytest
+from pydantic import BaseModel, Field, ValidationError, validator
+
+from schema_validator.compat import PYDANTIC_V2, pydantic_encoder
+from schema_validator.compiler import compile_serializer, compile_validator
+from schema_validator.engines import CompiledPydanticEngine
+
+pytestmark = pytest.mark.skipif(
+    PYDANTIC_V2, reason="pydantic v2 models are not compiled")
+
+
+class Color(str, Enum):
+    RED = "red"
+    BLUE = "blue"
+
+
+class Flat(BaseModel):
+    id: int
+    name: str
+    price: float = 1.5
+    active: bool = True
+    created: Optional[datetime] = None
+    day: Optional[date] = None
+    color: Color = Color.RED
+    note: Optional[str] = None
+    tags: Any = Field(default_factory=list)
+
+
+class Nested(BaseModel):
+    flat: Flat
+
+
+class Level(int, Enum):
+    LOW = 1
+
+
+class Tree(BaseModel):
+    name: str
+    score: float
+    level: Level
+    flat: Optional[Flat] = None
+    days: List[Optional[date]] = []
+    children: List[Nested] = []
+
+
+class Validated(BaseModel):
+    id: int
+
+    @validator("id")
+    def positive(cls, value: int) -> int:
+        return value
+
+
+class Constrained(BaseModel):
+    id: int = Field(..., gt=0)
+
+
+class Aliased(BaseModel):
+    id: int = Field(..., alias="ID")
+
+
+class Listed(BaseModel):
+    ids: List[int]
+
+
+VALUES = {
+    "id": [1, "2", "a", None, True, 1.0],
+    "name": ["bob", 1, None],
+    "price": [2.5, 3, "4.5", "x", None],
+    "active": [False, "true", 1, "x"],
+    "created": [
+        datetime(2021, 1, 1, tzinfo=timezone.utc), "2021-01-01T00:00:00Z",
+        1609459200, "x", None,
+    ],
+    "day": [date(2021, 1, 1), "2021-01-01", "x", None],
+    "color": ["blue", Color.BLUE, "green", None],
+    "note": ["x", None, 3],
+}
+
+
+def _result(function, data: dict):
+    try:
+        model = function(data)
+    except (TypeError, ValidationError) as e:
+        return type(e), str(e)
+    return model.__dict__, model.__fields_set__
+
+
+def test_same_results_as_pydantic() -> None:
+    validate = compile_validator(Flat)
+    assert validate is not None
+    names = list(VALUES)
+    for name in names:
+        for value in VALUES[name]:
+            for missing in itertools.chain([None], names):
+                data = {"id": 1, "name": "bob", name: value, "extra": 1}
+                data.pop(missing, None)
+                assert _result(validate, data) == _result(
+                    lambda data: Flat(**data), data), data
+
+
+def test_default_factory_called_per_instance() -> None:
+    validate = compile_validator(Flat)
+    first = validate({"id": 1, "name": "bob"})
+    assert first.tags == [] and first.tags is not validate(
+        {"id": 1, "name": "bob"}).tags
+
+
+@pytest.mark.parametrize(
+    "model", [Nested, Validated, Constrained, Aliased, Listed]
+)
+def test_not_compiled(model: Any) -> None:
+    assert compile_validator(model) is None
+
+
+def test_engine() -> None:
+    engine = CompiledPydanticEngine()
+    model = engine.prepare(Nested)
+    assert engine.validate_mapping(model, {"flat": {"id": 1, "name": "x"}})
+    assert engine.validate_mapping(Flat, {"id": 1, "name": "x"}) == Flat(
+        id=1, name="x")
+    with pytest.raises(engine.errors):
+        engine.validate_mapping(Flat, {"id": "x", "name": "x"})
+
+
+@pytest.mark.parametrize(
+    "value",
+    [
+        Tree(name="a\"é\n", score=float("inf"), level=1),
+        Tree(
+            name="b", score=-1, level=Level.LOW,
+            flat=Flat(id=1, name="x", created="2021-01-01T00:00:00Z"),
+            days=["2021-01-01", None],
+            children=[{"flat": {"id": 2, "name": "y", "tags": [1, "z"]}}],
+        ),
+    ],
+)
+def test_serializer(value: Tree) -> None:
+    serialize = compile_serializer(Tree)
+    assert serialize(value) == json.dumps(
+        value.dict(), default=pydantic_encoder, ensure_ascii=False,
+        separators=(",", ":")
+    )
+
+
+def test_serializer_unvalidated_values() -> None:
+    serialize = compile_serializer(Tree)
+    tree = Tree(name="a", score=1.5, level=1)
+    tree.name = 1
+    tree.score = "x"
+    tree.level = True
+    values = [
+        tree,
+        Tree.construct(
+            name=None, score=2, level="low", days=[datetime(2021, 1, 1), 1],
+            flat={"id": "1"}, children=[],
+        ),
+        Tree.construct(
+            name=Color.RED, score=True, level=1.5, days=None, flat=None,
+            children=[Flat.construct(id=False, name=b"", active=0)],
+        ),
+    ]
+    for value in values:
+        assert serialize(value) == json.dumps(
+            value.dict(), default=pydantic_encoder, ensure_ascii=False,
+            separators=(",", ":")
+        )
+
+
+class Excluded(BaseModel):
+    id: int
+    secret: str = Field("", exclude=True)
+
+
+class Encoded(BaseModel):
+    created: datetime
+
+    class Config:
+        json_encoders = {datetime: str}
+
+
+class Mapped(BaseModel):
+    ids: Dict[str, int]
+
+
+@pytest.mark.parametrize("model", [Excluded, Encoded, Mapped])
+def test_serializer_not_compiled(model: Any) -> None:
+    assert compile_serializer(model) is None
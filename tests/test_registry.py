@@ -0,0 +1,62 @@
+from dataclasses import dataclass
+from typing import Optional
+
+import pytest
+from pydantic import BaseModel
+
+from schema_validator import CompiledPydanticEngine
+from schema_validator.registry import model_registry
+from schema_validator.utils import DataSource, SchemaInvalidError, \
+    check_body_schema, check_response_schema
+
+
+@dataclass
+class DCDetails:
+    snake_name: str
+
+
+class Item(BaseModel):
+    details: DCDetails
+
+
+def test_dataclass_converted_once() -> None:
+    model = check_body_schema(DCDetails, DataSource.JSON)
+    assert check_response_schema(DCDetails)[200] is model
+    assert model_registry.model(model) is model
+
+
+def test_schema_memoized() -> None:
+    assert model_registry.schema(Item) is model_registry.schema(Item)
+
+
+def test_camel_schema_keeps_ref_names() -> None:
+    schema = model_registry.schema(Item, camel=True)
+    assert "DCDetails" in schema["definitions"]
+    assert "snakeName" in schema["definitions"]["DCDetails"]["properties"]
+
+
+def test_form_rejects_optional_nested_model() -> None:
+    class Form(BaseModel):
+        name: str
+        age: Optional[int] = None
+        item: Optional[Item] = None
+
+    with pytest.raises(SchemaInvalidError):
+        check_body_schema(Form, DataSource.FORM)
+
+
+class Prefetched(BaseModel):
+    name: str
+
+
+def test_prefetch_for_engine(monkeypatch) -> None:
+    engine = CompiledPydanticEngine()
+    model_registry.model(Prefetched, engine)
+    model_registry.prefetch([Prefetched], workers=2, engine=engine)
+
+    def json_schema(*args):
+        raise AssertionError("the prefetched schema was not used")
+
+    monkeypatch.setattr(engine, "json_schema", json_schema)
+    schema = model_registry.schema(Prefetched, engine=engine)
+    assert schema["properties"]["name"]["type"] == "string"